@@ -22,75 +22,123 @@
 #     - with the blue button we can make the 5th led blink
 
 
-
-from machine import Pin
+from machine import Pin, reset_cause, DEEPSLEEP_RESET
 import sys
 import time
-from hardware_config import BTN_NOTHALT, BTN_RICHTUNGSWECHEL, NEOPIXEL_PIN, NEOPIXEL_COUNT
-from hardware_config import LED_ROCRAIL
-
-# Direct NeoPixel control for boot phase (before asyncio)
-try:
-    from neopixel import NeoPixel
-    neo = NeoPixel(Pin(NEOPIXEL_PIN), NEOPIXEL_COUNT)
-    
-    # Clear all LEDs at startup
-    for i in range(NEOPIXEL_COUNT):
-        neo[i] = (0, 0, 0)
-    neo.write()
-    
-    # Set LED_ROCRAIL to orange (boot indicator)
-    neo[LED_ROCRAIL] = (255, 165, 0)  # Orange
-    neo.write()
-    LEDS_AVAILABLE = True
-except Exception as e:
-    print(f"NeoPixel init failed in boot: {e}")
-    LEDS_AVAILABLE = False
-
-
-# Configure your button pin (adjust pin number for your board)
-red_button   = Pin(BTN_NOTHALT, Pin.IN, Pin.PULL_UP)
-green_button = Pin(BTN_RICHTUNGSWECHEL, Pin.IN, Pin.PULL_UP)
-
-# Small delay to allow button state to stabilize
-time.sleep_ms(150)
-
-# Check if button is pressed (LOW when using pull-up)
-if not red_button.value():
-    # Set LED_ROCRAIL to purple for config mode
-    if LEDS_AVAILABLE:
-        neo[LED_ROCRAIL] = (128, 0, 128)  # Purple
-        neo.write()
+from hardware_config import BTN_NOTHALT, BTN_RICHTUNGSWECHEL
+from config import DEBUG_BOOT
+
 
-    print("\n\nRED Button pressed - Starting WiFi and rocrail configuration server...")
-    time.sleep_ms(100)  # Debounce delay
-    
+def _boot_led(color, mode):
+    """Show a boot status color on LED_ROCRAIL (lazy NeoPixel setup).
+
+    mode is a one-byte tag for the boot branch, cached in RTC memory: the
+    WS2812 strip keeps its last latched frame through deep sleep (only the
+    ESP32 core powers down), so if we wake into the same branch again the
+    strip already shows the right colour and the whole NeoPixel setup and
+    frame transmission can be skipped.
+
+    Returns the NeoPixel instance or None if LEDs are unavailable/skipped.
+    """
     try:
-        import wifi_config_server
-        wifi_config_server.start_config_server()
-    except ImportError:
-        print("Error: wifi_config_server.py not found!")
-    except Exception as e:
-        print(f"Error running config server: {e}")
-        
-elif not green_button.value():  # Green button pressed at startup
-    print("\n\nGreen Button pressed - REPL open, no program started")
-    # Do nothing else, drop to REPL
+        from machine import RTC
+        rtc = RTC()
+        if reset_cause() == DEEPSLEEP_RESET and rtc.memory() == mode:
+            return None
 
-else:
-    # Set LED_ROCRAIL to green for normal operation
-    if LEDS_AVAILABLE:
-        neo[LED_ROCRAIL] = (0, 255, 0)  # Green
+        from neopixel import NeoPixel
+        from hardware_config import NEOPIXEL_PIN, NEOPIXEL_COUNT, LED_ROCRAIL
+
+        neo = NeoPixel(Pin(NEOPIXEL_PIN), NEOPIXEL_COUNT)
+
+        # Compose the full frame (all off + status color), then emit one
+        # WS2812 frame - the intermediate all-off frame is never visible
+        # and each write() blocks for the whole strip transmission. The
+        # clear is a native memset of the internal GRB buffer instead of
+        # a Python loop allocating one tuple per pixel.
+        neo.buf[:] = b'\x00' * len(neo.buf)
+        neo[LED_ROCRAIL] = color
         neo.write()
-    
-    print("\n\nNormal startup - Running main program...")
+        rtc.memory(mode)
+        return neo
+    except Exception as e:
+        sys.print_exception(e)
+        return None
+
+
+def _run_main(btn_red=None, btn_green=None, neo=None):
+    """Start the normal rocrail controller program"""
+    if DEBUG_BOOT:
+        print("\n\nNormal startup - Running main program...")
     try:
         import rocrail_controller_asyncio
-        rocrail_controller_asyncio.run_controller()
+        rocrail_controller_asyncio.run_controller(btn_red=btn_red, btn_green=btn_green, neo=neo)
     except ImportError:
         print("Error: rocrail_controller_asyncio.py not found!")
 
     except Exception as e:
-        print(f"Error running main rocrail_controller.py: {e}")
+        sys.print_exception(e)
+
+
+# Fast path: a deep-sleep wake always means "resume the controller" unless
+# the red button itself (EXT0 wake source) woke us. Whatever enters deep
+# sleep must configure esp32.wake_on_ext0(Pin(BTN_NOTHALT), level=0) so a
+# config-mode request survives as an EXT0 wake. Every other wake cause
+# skips the button pin setup, settle loop and boot LED entirely.
+_fast_wake = False
+if reset_cause() == DEEPSLEEP_RESET:
+    try:
+        import esp32
+        _fast_wake = esp32.wake_reason() != esp32.WAKEUP_EXT0
+    except (ImportError, AttributeError):
+        pass
+
+if _fast_wake:
+    _run_main()
+
+else:
+    # Only the two boot buttons are configured up-front. Everything else
+    # (NeoPixel, config server, controller) is imported lazily inside the
+    # branch that actually needs it - each module import costs ~50-300 ms
+    # from SPI flash, and the green-button REPL branch should pay nothing.
+    red_button   = Pin(BTN_NOTHALT, Pin.IN, Pin.PULL_UP)
+    green_button = Pin(BTN_RICHTUNGSWECHEL, Pin.IN, Pin.PULL_UP)
+
+    # Let the button inputs settle by sampling until two successive reads
+    # agree instead of a fixed 150 ms sleep - worst case ~1.6 ms vs 150 ms.
+    # This only bridges the pull-up rise time after power-up; a button
+    # held through boot is a steady level, and contact bounce during
+    # operation is handled by the software debouncing in async_hardware.
+    for _ in range(8):
+        v1 = red_button.value() | (green_button.value() << 1)
+        time.sleep_us(200)
+        v2 = red_button.value() | (green_button.value() << 1)
+        if v1 == v2:
+            break
+
+    # Check if button is pressed (LOW when using pull-up)
+    if not red_button.value():
+        # Purple on LED_ROCRAIL for config mode
+        _boot_led((128, 0, 128), b'\x02')
+
+        if DEBUG_BOOT:
+            print("\n\nRED Button pressed - Starting WiFi and rocrail configuration server...")
+
+        try:
+            import wifi_config_server
+            wifi_config_server.start_config_server()
+        except ImportError:
+            print("Error: wifi_config_server.py not found!")
+        except Exception as e:
+            sys.print_exception(e)
 
+    elif not green_button.value():  # Green button pressed at startup
+        # Drop to REPL without importing anything heavy (no NeoPixel either)
+        if DEBUG_BOOT:
+            print("\n\nGreen Button pressed - REPL open, no program started")
 
+    else:
+        # Green on LED_ROCRAIL for normal operation; hand the live
+        # NeoPixel on to the controller so it is built only once
+        neo = _boot_led((0, 255, 0), b'\x01')
+        _run_main(btn_red=red_button, btn_green=green_button, neo=neo)
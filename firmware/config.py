@@ -1,36 +1,49 @@
 # config.py - Application configuration settings
 # (Non-hardware settings from rocrail_config.py)
+#
+# Numeric settings are wrapped in micropython.const() so the compiler
+# can inline them as immediate operands in hot loops (LOAD_CONST instead
+# of a module-dict lookup); cross-module imports keep working unchanged.
+
+from micropython import const
+
+# Boot console chatter: USB-CDC writes block until the host drains and
+# even hostless prints pay the string formatting. 0 silences the boot
+# status prints; errors are always reported via sys.print_exception.
+DEBUG_BOOT = const(0)
 
 # RocRail settings
 ROCRAIL_HOST = "192.168.1.27"
-ROCRAIL_PORT = 8051
+ROCRAIL_PORT = const(8051)
 
 # Default locomotive
 DEFAULT_LOCO_ID = "BR103"
 
 # Locomotive management
 LOCO_LIST_FILE = "loco_list.txt"
-LOCO_QUERY_INTERVAL = 30000  # Query locomotives every 30 seconds
-LOCO_QUERY_TIMEOUT = 10000   # Timeout for locomotive query response (10 seconds)
-MAX_LOCOMOTIVES = 5  # Limited by NeoPixel LEDs 1-5
+LOCO_QUERY_INTERVAL = const(30000)  # Query locomotives every 30 seconds
+LOCO_QUERY_TIMEOUT = const(10000)   # Timeout for locomotive query response (10 seconds)
+MAX_LOCOMOTIVES = const(5)  # Limited by NeoPixel LEDs 1-5
 
 # Timing intervals (ms)
-WIFI_CHECK_INTERVAL = 15500
-WIFI_RECONNECT_MAX_RETRIES = 5  # Maximum retries for WiFi reconnection
-ROCRAIL_CHECK_INTERVAL = 13200
+WIFI_CHECK_INTERVAL = const(15500)
+WIFI_RECONNECT_MAX_RETRIES = const(5)  # Maximum retries for WiFi reconnection
+ROCRAIL_CHECK_INTERVAL = const(13200)
+ROCRAIL_KEEPALIVE_INTERVAL = const(20000)  # ms idle before a keep-alive frame; 2x = presumed dead
 
 # RocRail reconnection settings
-RECONNECT_DELAY_FAST = 3000         # 3s für erste Versuche (weniger aggressiv)
-RECONNECT_DELAY_SLOW = 8000         # 8s für spätere Versuche  
-RECONNECT_FAST_ATTEMPTS = 3         # nur 3x schnell, dann langsamer
-RECONNECT_UNLIMITED = True          # Niemals aufgeben
-SOCKET_TIMEOUT = 10                 # Socket timeout in seconds (erhöht)
+RECONNECT_DELAY_FAST = const(3000)      # 3s für erste Versuche (weniger aggressiv)
+RECONNECT_DELAY_SLOW = const(8000)      # 8s für spätere Versuche
+RECONNECT_FAST_ATTEMPTS = const(3)      # nur 3x schnell, dann langsamer
+RECONNECT_UNLIMITED = True              # Niemals aufgeben
+SOCKET_TIMEOUT = const(10)              # Socket timeout in seconds (erhöht)
+ROCRAIL_RX_CHUNK = const(8192)          # Receive buffer size (lclist bursts are tens of KB)
 
-LOCO_CHECK_INTERVAL = 100
-POTI_UPDATE_INTERVAL = 50
-BUTTON_CHECK_INTERVAL = 10
-SPEED_UPDATE_INTERVAL = 333
+LOCO_CHECK_INTERVAL = const(100)
+POTI_UPDATE_INTERVAL = const(50)
+BUTTON_CHECK_INTERVAL = const(10)
+SPEED_UPDATE_INTERVAL = const(333)
 
 # Potentiometer settings
-POTI_FILTER_SIZE = 3
-POTI_THRESHOLD = 1
\ No newline at end of file
+POTI_FILTER_SIZE = const(3)
+POTI_THRESHOLD = const(1)
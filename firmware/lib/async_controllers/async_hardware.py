@@ -5,8 +5,41 @@ Handles buttons, potentiometer with asyncio
 
 import asyncio
 import time
-from machine import Pin, ADC
+import micropython
+from array import array
+from machine import Pin, ADC, mem32
 from hardware_config import *
+from config import BUTTON_CHECK_INTERVAL, POTI_UPDATE_INTERVAL
+
+# ESP32 GPIO_IN_REG - input levels of GPIOs 0-31 in one 32-bit word.
+# All six buttons sit below GPIO 32, so one register load replaces six
+# Pin.value() calls (six dict lookups + Python->C transitions) per sweep.
+_GPIO_IN_REG = micropython.const(0x3FF4403C)
+
+# Fallback result for the input error path - copied on return so a
+# caller can't corrupt the template
+_EMPTY_INPUTS = {
+    'emergency': False,
+    'direction': False,
+    'sound': False,
+    'light': False,
+    'btn_up': False,
+    'btn_down': False,
+    'speed': 0,
+}
+
+
+@micropython.viper
+def _poti_step(buf: ptr16, idx: int, new: int, prev_sum: int) -> int:
+    """Ring-buffer filter step: subtract oldest, store newest, return sum.
+
+    Viper-compiled straight to native code - no bytecode dispatch and no
+    integer boxing on the ~20 Hz poti sampling path. Only this scalar
+    kernel is viperized; the surrounding coroutine stays regular Python.
+    """
+    prev_sum -= int(buf[idx])
+    buf[idx] = new
+    return prev_sum + new
 
 
 class AsyncHardwareManager:
@@ -15,56 +48,127 @@ class AsyncHardwareManager:
     Replaces polling with async button/potentiometer reading
     """
     
-    def __init__(self):
-        # Initialize hardware pins
+    def __init__(self, btn_red=None, btn_green=None):
+        # Initialize hardware pins - boot.py already constructed the red
+        # and green button pins for its branch decision; reuse those
+        # handles instead of reconfiguring the same pad mux twice
         self.buttons = {}
         self.speed_adc = None
+        self._btn_red = btn_red
+        self._btn_green = btn_green
         
         # Button debouncing state - simplified
         self._last_button_states = {}
         self._last_button_times = {}
+
+        # IRQ-driven press detection (relaxing-timer debounce): the ISR
+        # records a press and ignores further edges inside the relax
+        # window; the input task only consumes the pending flags
+        self._button_debounce_ms = 20
+        self._pending_press = {}
+        self._use_irq = False
+        # ISR-safe wakeup for coroutines that want to sleep until any
+        # button press instead of polling (ThreadSafeFlag is the only
+        # asyncio primitive that may be set from an ISR)
+        try:
+            self._press_flag = asyncio.ThreadSafeFlag()
+        except AttributeError:
+            self._press_flag = None
         
         # Potentiometer calibration (from adc_test.py)
         self.POTI_MIN_VALUE = 1310  # Minimum mechanical poti value
         self.POTI_MAX_VALUE = 2360  # Maximum mechanical poti value
-        
-        # Speed filtering
-        self._speed_samples = []
+        self.POTI_RANGE = self.POTI_MAX_VALUE - self.POTI_MIN_VALUE
+
+        # Speed filtering - fixed-size ring buffer plus running sum:
+        # zero allocation and no list shifts per sample (list.pop(0) is an
+        # O(N) memmove and GC pauses are the main source of ESP32 jitter)
         self._speed_filter_size = 5
         self._speed_threshold = 1
-        
-        # Async synchronization
-        self._hardware_lock = asyncio.Lock()
-        
+        self._speed_samples = array('H', [0] * self._speed_filter_size)
+        self._speed_sum = 0
+        self._speed_idx = 0
+        # read_all_inputs runs at the 10 ms button tick but the poti only
+        # needs POTI_UPDATE_INTERVAL resolution - decimate the ADC reads
+        self._speed_ticks = max(1, POTI_UPDATE_INTERVAL // BUTTON_CHECK_INTERVAL)
+        self._speed_countdown = 0
+        self._last_speed = 0
+
+        # Reused result dict - consumers read the fields and discard,
+        # so returning the same object every tick halves the dict
+        # allocation rate on the hot input path
+        self._inputs = _EMPTY_INPUTS.copy()
+
+        # No lock: asyncio is single-threaded and the input task is the
+        # only consumer - a lock would just add two scheduler round-trips
+        # per call
+
     async def initialize(self):
         """Initialize hardware pins"""
         print("Initializing async hardware...")
         
         try:
             # Initialize buttons
-            self.buttons = {
-                'emergency': Pin(BTN_NOTHALT, Pin.IN, Pin.PULL_UP),
-                'direction': Pin(BTN_RICHTUNGSWECHEL, Pin.IN, Pin.PULL_UP), 
-                'sound': Pin(BTN_GELB, Pin.IN, Pin.PULL_UP),
-                'light': Pin(BTN_BLAU, Pin.IN, Pin.PULL_UP),
-                'btn_up': Pin(BTN_MITTE_UP, Pin.IN, Pin.PULL_UP),
-                'btn_down': Pin(BTN_MITTE_DOWN, Pin.IN, Pin.PULL_UP)
+            button_gpios = {
+                'emergency': BTN_NOTHALT,
+                'direction': BTN_RICHTUNGSWECHEL,
+                'sound': BTN_GELB,
+                'light': BTN_BLAU,
+                'btn_up': BTN_MITTE_UP,
+                'btn_down': BTN_MITTE_DOWN
             }
-            
+            prebuilt = {'emergency': self._btn_red, 'direction': self._btn_green}
+            self.buttons = {}
+            for name, gpio in button_gpios.items():
+                self.buttons[name] = prebuilt.get(name) or Pin(gpio, Pin.IN, Pin.PULL_UP)
+
+            # Bitmask setup for the one-word GPIO register sweep
+            self._button_bits = tuple(
+                (name, 1 << gpio) for name, gpio in button_gpios.items()
+            )
+            self._buttons_mask = 0
+            for _, bit in self._button_bits:
+                self._buttons_mask |= bit
+            # Frozen iteration order for the per-tick loop - iterating a
+            # tuple skips the dict-view setup cost of self.buttons each tick
+            self._button_names = tuple(button_gpios)
+            # Pre-bound .value methods: one call per read instead of a
+            # dict lookup plus attribute fetch per button per tick
+            self._value_funcs = {n: p.value for n, p in self.buttons.items()}
+            self._prev_levels = mem32[_GPIO_IN_REG] & self._buttons_mask
+
             # Initialize button states - simplified
             for name in self.buttons:
                 self._last_button_states[name] = self.buttons[name].value()  # Store actual pin value
                 self._last_button_times[name] = time.ticks_ms()
-                
+                self._pending_press[name] = False
+
+            # Register falling-edge IRQs (soft handlers are sufficient,
+            # see MicroPython ESP32 IRQ latency notes) - zero CPU while
+            # idle and press latency drops from one poll interval to
+            # IRQ dispatch time. Falls back to polling if unsupported.
+            try:
+                for name in self.buttons:
+                    self.buttons[name].irq(
+                        trigger=Pin.IRQ_FALLING,
+                        handler=self._make_button_isr(name)
+                    )
+                self._use_irq = True
+                print("✓ Button IRQs registered")
+            except Exception as e:
+                print(f"Button IRQ setup failed, using polling: {e}")
+
             # Initialize speed potentiometer
             self.speed_adc = ADC(Pin(ADC_GESCHWINDIGKEIT))
             self.speed_adc.atten(ADC.ATTN_11DB)
             
-            # Initialize speed filter with normalized values
-            for _ in range(self._speed_filter_size):
-                raw_value = self.speed_adc.read()
-                speed = self._normalize_speed(raw_value)
-                self._speed_samples.append(speed)
+            # Prime the speed filter from a single ADC read broadcast to
+            # the whole ring buffer - one conversion and one scale
+            # instead of five during boot
+            init_speed = self._normalize_speed(self.speed_adc.read())
+            for i in range(self._speed_filter_size):
+                self._speed_samples[i] = init_speed
+            self._speed_sum = init_speed * self._speed_filter_size
                 
             print("✓ Async hardware initialized")
             return True
@@ -73,49 +177,142 @@ class AsyncHardwareManager:
             print(f"Hardware initialization error: {e}")
             return False
             
-    async def _read_button_debounced(self, name, debounce_ms=20):
-        """Read button with simple debouncing - returns True on button press"""
+    def _make_button_isr(self, name):
+        """Build the falling-edge ISR for one button (relaxing timer)
+
+        The ISR only records a *candidate* press: release bounce also
+        produces falling edges, hundreds of ms after the press and
+        therefore outside the relax window, so an edge alone proves
+        nothing. _read_button_debounced verifies the settled level
+        before reporting the press.
+        """
+        # Bind everything the ISR touches into the closure: locals are
+        # LOAD_FAST while globals/attributes cost dict lookups, and the
+        # ISR should stay as short as possible
+        ticks_ms = time.ticks_ms
+        ticks_diff = time.ticks_diff
+        last_times = self._last_button_times
+        pending = self._pending_press
+        debounce_ms = self._button_debounce_ms
+        press_flag = self._press_flag
+
+        def _isr(pin):
+            now = ticks_ms()
+            # Ignore bounce edges inside the relax window
+            if ticks_diff(now, last_times[name]) > debounce_ms:
+                last_times[name] = now
+                pending[name] = True
+                if press_flag:
+                    press_flag.set()
+        return _isr
+
+    async def wait_for_press(self):
+        """Sleep until any button press (IRQ mode only).
+
+        Zero-CPU alternative to polling read_all_inputs; the pending
+        flags still record which button fired. Falls back to a short
+        sleep when IRQs or ThreadSafeFlag are unavailable.
+        """
+        if self._use_irq and self._press_flag:
+            await self._press_flag.wait()
+        else:
+            await asyncio.sleep(BUTTON_CHECK_INTERVAL / 1000)
+
+    def _read_button_debounced(self, name, debounce_ms=20):
+        """Read button with simple debouncing - returns True on button press
+
+        Plain function on purpose: it never awaits, so an async def would
+        only pay coroutine allocation + scheduler bookkeeping per call.
+        """
         if name not in self.buttons:
             return False
-            
+
+        # IRQ mode: consume the candidate recorded by the ISR, but only
+        # after the relax window has passed and the pin still reads
+        # pressed. A real press is still held low when the next tick
+        # samples it; a release-bounce edge has settled back high by
+        # then, so the phantom press is dropped here.
+        if self._use_irq:
+            if self._pending_press[name]:
+                if time.ticks_diff(time.ticks_ms(), self._last_button_times[name]) < debounce_ms:
+                    return False  # still settling - re-check next tick
+                self._pending_press[name] = False
+                if self._value_funcs[name]() == 0:
+                    print(f"[BUTTON] {name} press detected!")  # Debug output
+                    return True
+            return False
+
+        # Bind lookups to locals - 2-3x faster than global/attribute
+        # loads in MicroPython bytecode and this runs per button per tick
+        last_states = self._last_button_states
+        last_times = self._last_button_times
+
         current_time = time.ticks_ms()
-        current_value = self.buttons[name].value()  # 0 = pressed (pull-up), 1 = not pressed
-        
-        # Check if enough time has passed since last state change
-        time_since_last = time.ticks_diff(current_time, self._last_button_times[name])
-        if time_since_last < debounce_ms:
+
+        # Check if enough time has passed since last state change -
+        # gate before the pin read so bounce windows skip the GPIO call
+        if time.ticks_diff(current_time, last_times[name]) < debounce_ms:
             return False
-            
-        # Check for button press (transition from 1 to 0 for pull-up)
-        if self._last_button_states[name] == 1 and current_value == 0:
-            # Button was just pressed
-            self._last_button_states[name] = current_value
-            self._last_button_times[name] = current_time
-            print(f"[BUTTON] {name} press detected!")  # Debug output
-            return True
-            
-        # Update state if it changed
-        if self._last_button_states[name] != current_value:
-            self._last_button_states[name] = current_value
-            self._last_button_times[name] = current_time
-            
+
+        current_value = self._value_funcs[name]()  # 0 = pressed (pull-up), 1 = not pressed
+        last_value = last_states[name]
+
+        # XOR spots any edge in one compare; only then touch the state
+        if last_value ^ current_value:
+            last_states[name] = current_value
+            last_times[name] = current_time
+            # Press = transition to 0 (pull-up); last_value is known != 0
+            if current_value == 0:
+                print(f"[BUTTON] {name} press detected!")  # Debug output
+                return True
+
         return False
         
+    def _read_buttons_polled(self, out):
+        """Scan all six buttons from one GPIO register read (fallback mode)
+
+        Falling edges are detected branchlessly: prev & ~cur are exactly
+        the bits that went 1 (released) -> 0 (pressed) since last sweep.
+        Results are written into the caller-provided dict.
+        """
+        cur = mem32[_GPIO_IN_REG] & self._buttons_mask
+        prev = self._prev_levels
+        changed_bits = prev ^ cur
+        pressed_bits = prev & ~cur
+        self._prev_levels = cur
+
+        now = time.ticks_ms()
+        ticks_diff = time.ticks_diff
+        last_times = self._last_button_times
+        debounce_ms = self._button_debounce_ms
+
+        for name, bit in self._button_bits:
+            if changed_bits & bit:
+                # Every edge restamps the relax window, releases
+                # included - a release edge would otherwise leave the
+                # old press timestamp in place, putting release-bounce
+                # glitches outside the window and raising phantom
+                # presses. Only a falling edge after a quiet window
+                # counts as a press.
+                out[name] = bool(pressed_bits & bit) and \
+                    ticks_diff(now, last_times[name]) > debounce_ms
+                last_times[name] = now
+            else:
+                out[name] = False
+
     def _normalize_speed(self, raw_value):
         """Normalize potentiometer raw value to 0-100 speed range"""
         # Apply calibrated range from adc_test.py
         if raw_value <= self.POTI_MIN_VALUE:
-            normalized = 0
-        elif raw_value >= self.POTI_MAX_VALUE:
-            normalized = 100  # Maximum locomotive speed
-        else:
-            # Map calibrated range to 0-100
-            ratio = (raw_value - self.POTI_MIN_VALUE) / (self.POTI_MAX_VALUE - self.POTI_MIN_VALUE)
-            normalized = int(ratio * 100)
-            
-        return max(0, min(100, normalized))
+            return 0
+        if raw_value >= self.POTI_MAX_VALUE:
+            return 100  # Maximum locomotive speed
+        # Map calibrated range to 0-100 with pure integer math - float
+        # division is ~5-10x slower on ESP32 MicroPython and this runs
+        # every POTI_UPDATE_INTERVAL tick
+        return ((raw_value - self.POTI_MIN_VALUE) * 100) // self.POTI_RANGE
         
-    async def _read_speed_filtered(self):
+    def _read_speed_filtered(self):
         """Read speed potentiometer with filtering and calibration"""
         try:
             # Read raw ADC value
@@ -124,14 +321,14 @@ class AsyncHardwareManager:
             # Apply calibrated normalization
             speed = self._normalize_speed(raw_value)
             
-            # Update sliding window filter
-            self._speed_samples.append(speed)
-            if len(self._speed_samples) > self._speed_filter_size:
-                self._speed_samples.pop(0)
-                
-            # Calculate filtered average
-            filtered_speed = sum(self._speed_samples) // len(self._speed_samples)
-            
+            # Ring buffer update via the native viper kernel - the
+            # running sum keeps the average O(1) with zero allocation
+            idx = self._speed_idx
+            self._speed_sum = _poti_step(self._speed_samples, idx, speed, self._speed_sum)
+            self._speed_idx = (idx + 1) % self._speed_filter_size
+
+            filtered_speed = self._speed_sum // self._speed_filter_size
+
             return max(0, min(100, filtered_speed))
             
         except Exception as e:
@@ -139,43 +336,39 @@ class AsyncHardwareManager:
             return 0
             
     async def read_all_inputs(self):
-        """Read all hardware inputs asynchronously"""
-        async with self._hardware_lock:
-            try:
-                # Read all buttons
-                buttons = {}
-                for name in self.buttons:
-                    buttons[name] = await self._read_button_debounced(name)
-                    
-                # Read speed 
-                speed = await self._read_speed_filtered()
-                
-                return {
-                    'emergency': buttons['emergency'],
-                    'direction': buttons['direction'],
-                    'sound': buttons['sound'],
-                    'light': buttons['light'],
-                    'btn_up': buttons['btn_up'],
-                    'btn_down': buttons['btn_down'],
-                    'speed': speed
-                }
-                
-            except Exception as e:
-                print(f"Input reading error: {e}")
-                return {
-                    'emergency': False,
-                    'direction': False, 
-                    'sound': False,
-                    'light': False,
-                    'btn_up': False,
-                    'btn_down': False,
-                    'speed': 0
-                }
-                
+        """Read all hardware inputs asynchronously.
+
+        Returns the same dict object every tick - read the fields, don't
+        keep a reference across ticks.
+        """
+        inputs = self._inputs
+        try:
+            if self._use_irq:
+                # Consume presses recorded by the ISRs
+                read_button = self._read_button_debounced
+                for name in self._button_names:
+                    inputs[name] = read_button(name)
+            else:
+                # Polled fallback: one register read for all six buttons
+                self._read_buttons_polled(inputs)
+
+            # Read speed every Nth tick only; reuse the filtered value
+            # in between (saves 4 of 5 ADC conversions per 50 ms)
+            self._speed_countdown -= 1
+            if self._speed_countdown <= 0:
+                self._speed_countdown = self._speed_ticks
+                self._last_speed = self._read_speed_filtered()
+            inputs['speed'] = self._last_speed
+
+            return inputs
+
+        except Exception as e:
+            print(f"Input reading error: {e}")
+            return _EMPTY_INPUTS.copy()
+
     async def get_speed(self):
         """Get current filtered speed value"""
-        async with self._hardware_lock:
-            return await self._read_speed_filtered()
+        return self._read_speed_filtered()
             
     async def get_raw_adc(self):
         """Get raw ADC value for debugging"""
@@ -7,6 +7,14 @@ import asyncio
 import time
 from hardware_config import *
 
+# Millisecond sleep without the float path; note the esp32 OS tick
+# bounds the effective minimum (~10 ms), so sub-tick sleeps round up
+if hasattr(asyncio, 'sleep_ms'):
+    _sleep_ms = asyncio.sleep_ms
+else:
+    async def _sleep_ms(ms):
+        await asyncio.sleep(ms / 1000)
+
 try:
     from neopixel import NeoPixel
     from machine import Pin
@@ -15,6 +23,42 @@ except ImportError:
     NEOPIXEL_AVAILABLE = False
     print("NeoPixel not available")
 
+# Precomputed status colors - the state set is finite, so building a
+# fresh (r, g, b) tuple per update call only fed the GC. Bright/dim
+# pairs encode the two blink phases (255 / LED_DIM_HIGH / LED_DIM_LOW).
+_COL_OFF = (0, 0, 0)
+_COL_GREEN_BRIGHT = (0, 255, 0)
+_COL_GREEN_DIM = (0, 50, 0)
+_COL_ORANGE_BRIGHT = (255, 127, 0)
+_COL_ORANGE_DIM = (20, 10, 0)
+_COL_ORANGE_INIT = (255, 165, 0)
+_COL_RED_BRIGHT = (255, 0, 0)
+_COL_RED_DIM = (20, 0, 0)
+_COL_RED_DIM_HIGH = (50, 0, 0)
+_COL_YELLOW_BRIGHT = (255, 255, 0)
+_COL_YELLOW_DIM = (20, 20, 0)
+_COL_BLUE_BRIGHT = (0, 0, 255)
+_COL_BLUE_SWEEP = (0, 0, 100)
+_COL_PURPLE_BRIGHT = (127, 0, 255)
+_COL_PURPLE_DIM = (10, 0, 20)
+
+# status -> (dim phase, bright phase) color pair, indexed by the blink
+# boolean. Keyed on status alone (not a (status, blink) tuple) so the
+# lookup allocates nothing. Unknown statuses fall back to off.
+_WIFI_COLORS = {
+    "connected": (_COL_GREEN_DIM, _COL_GREEN_BRIGHT),
+    "connecting": (_COL_ORANGE_DIM, _COL_ORANGE_BRIGHT),
+    "failed": (_COL_RED_DIM, _COL_RED_BRIGHT),
+}
+_ROCRAIL_COLORS = {
+    "connected": (_COL_GREEN_BRIGHT, _COL_GREEN_BRIGHT),
+    "connecting": (_COL_YELLOW_DIM, _COL_YELLOW_BRIGHT),
+    "reconnecting": (_COL_ORANGE_DIM, _COL_ORANGE_BRIGHT),
+    "lost": (_COL_RED_DIM, _COL_RED_BRIGHT),
+    "error": (_COL_RED_BRIGHT, _COL_RED_BRIGHT),
+    "failed": (_COL_RED_DIM_HIGH, _COL_RED_DIM_HIGH),
+}
+
 
 class AsyncNeoPixelController:
     """
@@ -22,8 +66,11 @@ class AsyncNeoPixelController:
     Handles status visualization with asyncio timing
     """
     
-    def __init__(self):
-        self.neo = None
+    def __init__(self, neo=None):
+        # Reuse an already-constructed NeoPixel (from boot.py) when given
+        # instead of reinitialising the RMT peripheral and reallocating
+        # the pixel buffer
+        self.neo = neo
         self.enabled = False
         
         # LED brightness levels
@@ -32,15 +79,38 @@ class AsyncNeoPixelController:
         self.LED_DIM_LOW = 20
         self.LED_OFF = 0
         
-        # Blinking state
+        # Blinking state - flipped by the shared _blink_ticker task;
+        # status updaters just read the boolean instead of re-checking
+        # ticks_ms per call. The event fires once per phase flip for
+        # consumers that want to redraw on transitions.
         self._blink_state = False
-        self._last_blink_time = 0
-        
-        # Async synchronization
-        self._led_lock = asyncio.Lock()
+        self._blink_event = asyncio.Event()
+        self._blink_task = None
+
+        # (status, phase) each updater last drew - on steady-state ticks
+        # where neither moved, the updaters return before any lookup
+        self._drawn_wifi = None
+        self._drawn_rocrail = None
+        self._drawn_warning = None
         
-        # LED state cache to avoid unnecessary updates
-        self._led_states = {}
+        # No lock: asyncio here is cooperative and neo.write() never
+        # yields, so a frame transmission can't be interleaved anyway -
+        # the lock only added scheduler transitions per flush
+        # LED state cache to avoid unnecessary updates - a flat list
+        # indexed by LED position (keys are the fixed range
+        # 0..NEOPIXEL_COUNT, so a dict hash per check is wasted work)
+        self._led_states = [None] * NEOPIXEL_COUNT
+
+        # Frame dirty flag - _stage_led only mutates the pixel buffer,
+        # flush() transmits the whole frame once. The event wakes the
+        # background refresh loop, which coalesces any number of staged
+        # changes into at most ~60 frames/s.
+        self._dirty = False
+        self._dirty_event = asyncio.Event()
+        self._refresh_task = None
+        # Consecutive neo.write() failures - repeated ones mean a real
+        # RMT problem, not something to silently retry forever
+        self._write_failures = 0
         
     async def initialize(self):
         """Initialize NeoPixel LEDs"""
@@ -49,12 +119,19 @@ class AsyncNeoPixelController:
             return True
             
         try:
-            self.neo = NeoPixel(Pin(NEOPIXEL_PIN), NEOPIXEL_COUNT)
+            if self.neo is None:
+                self.neo = NeoPixel(Pin(NEOPIXEL_PIN), NEOPIXEL_COUNT)
             
             # Clear all LEDs
             await self._clear_all()
             
             self.enabled = True
+
+            # One shared ticker drives all blinking LEDs, one refresh
+            # loop owns the actual frame transmissions
+            self._blink_task = asyncio.create_task(self._blink_ticker())
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
             print("✓ Async NeoPixel initialized")
             return True
             
@@ -65,134 +142,160 @@ class AsyncNeoPixelController:
             
     async def cleanup(self):
         """Cleanup LEDs"""
+        if self._blink_task:
+            self._blink_task.cancel()
+            self._blink_task = None
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
         if self.enabled:
             await self._clear_all()
             
     async def _clear_all(self):
         """Clear all LEDs"""
-        async with self._led_lock:
-            if self.neo:
-                try:
-                    for i in range(NEOPIXEL_COUNT):
-                        self.neo[i] = (0, 0, 0)
-                    self.neo.write()
-                except:
-                    pass  # Silent error handling
-                    
-    async def _set_led(self, index, color, force_update=False):
-        """Set LED color with state caching"""
+        if self.neo:
+            # Native memset of the GRB buffer - ~10x faster than a
+            # Python loop with a tuple allocation per pixel
+            self.neo.buf[:] = b'\x00' * len(self.neo.buf)
+            for i in range(NEOPIXEL_COUNT):
+                self._led_states[i] = _COL_OFF
+            self._dirty = True
+        await self.flush()
+
+    def _stage_led(self, index, color, force_update=False):
+        """Stage one LED color into the pixel buffer (no transmission)"""
         if not self.enabled or not self.neo:
             return
-            
+
         # Check if color actually changed
-        if not force_update and self._led_states.get(index) == color:
+        if not force_update and self._led_states[index] == color:
             return
-            
-        async with self._led_lock:
-            try:
-                self.neo[index] = color
-                self.neo.write()
-                self._led_states[index] = color
-            except:
-                pass  # Silent error handling
+
+        # No try frame here: a buffer store on a valid index can't fail,
+        # and the old bare except only masked real bugs
+        self.neo[index] = color
+        self._led_states[index] = color
+        self._dirty = True
+        self._dirty_event.set()
+
+    async def flush(self):
+        """Transmit the staged frame - one WS2812/RMT frame per call.
+
+        No-op when nothing was staged, so callers can flush
+        unconditionally after a batch of _stage_led calls.
+        """
+        if not self._dirty or not self.neo:
+            return
+        try:
+            self.neo.write()
+            self._dirty = False
+            self._write_failures = 0
+        except Exception as e:
+            # An RMT write failure is an actionable timing/lockup bug;
+            # count it and give up on LEDs rather than retry blindly
+            self._write_failures += 1
+            if self._write_failures >= 5:
+                print(f"NeoPixel write failing repeatedly: {e}")
+                self.force_disable()
+
+    async def _set_led(self, index, color, force_update=False):
+        """Set a single LED and transmit immediately"""
+        self._stage_led(index, color, force_update)
+        await self.flush()
+
+    async def _refresh_loop(self):
+        """Transmit staged changes, capped at one frame per ~16 ms.
+
+        However many LEDs the status updaters stage between wakeups,
+        the strip sees a single coalesced write - this bounds the RMT
+        duty cycle no matter how chatty the callers get.
+        """
+        while True:
+            await self._dirty_event.wait()
+            self._dirty_event.clear()
+            await self.flush()
+            await _sleep_ms(16)
                 
-    async def _update_blink_state(self):
-        """Update global blink state"""
-        current_time = time.ticks_ms()
-        if time.ticks_diff(current_time, self._last_blink_time) >= NEOPIXEL_BLINK_INTERVAL:
+    async def _blink_ticker(self):
+        """Flip the shared blink phase on a fixed interval.
+
+        One timer for all blinking LEDs - the old per-update ticks_ms
+        comparison ran three times per refresh cycle for the same answer.
+        """
+        while True:
+            await _sleep_ms(NEOPIXEL_BLINK_INTERVAL)
             self._blink_state = not self._blink_state
-            self._last_blink_time = current_time
-            
+            self._blink_event.set()
+            self._blink_event.clear()
+
     async def update_wifi_status(self, status):
         """Update WiFi status LED"""
-        await self._update_blink_state()
-        
-        if status == "connected":
-            # Green with dim/bright pulsing
-            brightness = self.LED_BRIGHT if self._blink_state else self.LED_DIM_HIGH
-            color = (0, brightness, 0)
-        elif status == "connecting":
-            # Orange blinking
-            brightness = self.LED_BRIGHT if self._blink_state else self.LED_DIM_LOW
-            color = (brightness, brightness//2, 0)
-        elif status == "failed":
-            # Red blinking
-            brightness = self.LED_BRIGHT if self._blink_state else self.LED_DIM_LOW
-            color = (brightness, 0, 0)
-        else:
-            # Off for initial/unknown states
-            color = (0, 0, 0)
-            
-        await self._set_led(LED_WIFI, color)
+        phase = self._blink_state
+        if (status, phase) == self._drawn_wifi:
+            return
+        self._drawn_wifi = (status, phase)
+
+        pair = _WIFI_COLORS.get(status)
+        color = pair[phase] if pair else _COL_OFF
+
+        # Stage only - the refresh loop coalesces the actual write; on
+        # a cache hit this is a single list compare
+        self._stage_led(LED_WIFI, color)
         
     async def update_rocrail_status(self, status):
         """Update RocRail status LED with improved feedback"""
-        await self._update_blink_state()
-        
-        if status == "connected":
-            # Solid bright green
-            color = (0, self.LED_BRIGHT, 0)
-        elif status == "connecting":
-            # Yellow blinking (initial connection)
-            brightness = self.LED_BRIGHT if self._blink_state else self.LED_DIM_LOW
-            color = (brightness, brightness, 0)
-        elif status == "reconnecting":
-            # Orange fast blinking (attempting reconnection)
-            # Use faster blink for urgency
-            fast_blink = (time.ticks_ms() // 250) % 2
-            brightness = self.LED_BRIGHT if fast_blink else self.LED_DIM_LOW
-            color = (brightness, brightness//2, 0)
-        elif status == "lost":
-            # Red fast blinking (connection lost, waiting to reconnect)
-            fast_blink = (time.ticks_ms() // 250) % 2
-            brightness = self.LED_BRIGHT if fast_blink else self.LED_DIM_LOW
-            color = (brightness, 0, 0)
-        elif status == "error":
-            # Solid red (error state)
-            color = (self.LED_BRIGHT, 0, 0)
-        elif status == "failed":
-            # Dim red (permanent failure)
-            color = (self.LED_DIM_HIGH, 0, 0)
+        if status == "reconnecting" or status == "lost":
+            # Fast blink for urgency - phase straight off the clock
+            phase = (time.ticks_ms() // 250) % 2
         else:
-            # Off for disconnected/unknown
-            color = (0, 0, 0)
-            
-        await self._set_led(LED_ROCRAIL, color)
+            phase = self._blink_state
+        if (status, phase) == self._drawn_rocrail:
+            return
+        self._drawn_rocrail = (status, phase)
+
+        pair = _ROCRAIL_COLORS.get(status)
+        color = pair[phase] if pair else _COL_OFF
+
+        self._stage_led(LED_ROCRAIL, color)
         
     async def update_direction(self, is_forward):
         """Update direction indicator LEDs"""
         if is_forward:
             # Left LED bright yellow (forward)
-            await self._set_led(LED_DIR_LEFT, (self.LED_BRIGHT, self.LED_BRIGHT, 0))
-            await self._set_led(LED_DIR_RIGHT, (0, 0, 0))
+            self._stage_led(LED_DIR_LEFT, _COL_YELLOW_BRIGHT)
+            self._stage_led(LED_DIR_RIGHT, _COL_OFF)
         else:
             # Right LED bright yellow (reverse)
-            await self._set_led(LED_DIR_LEFT, (0, 0, 0))
-            await self._set_led(LED_DIR_RIGHT, (self.LED_BRIGHT, self.LED_BRIGHT, 0))
+            self._stage_led(LED_DIR_LEFT, _COL_OFF)
+            self._stage_led(LED_DIR_RIGHT, _COL_YELLOW_BRIGHT)
             
     async def update_speed_warning(self, warning_active):
         """Update speed warning LED (poti zero required)"""
+        phase = self._blink_state
+        if (warning_active, phase) == self._drawn_warning:
+            return
+        self._drawn_warning = (warning_active, phase)
+
         if warning_active:
-            await self._update_blink_state()
             # Purple blinking when poti zero required
-            brightness = self.LED_BRIGHT if self._blink_state else self.LED_DIM_LOW
-            color = (brightness//2, 0, brightness)
+            color = _COL_PURPLE_BRIGHT if self._blink_state else _COL_PURPLE_DIM
         else:
             # Off when normal operation
-            color = (0, 0, 0)
-            
-        await self._set_led(LED_ACTIVITY, color)
+            color = _COL_OFF
+
+        self._stage_led(LED_ACTIVITY, color)
         
     async def update_locomotive_selection(self, selected_index, total_locos):
         """Update locomotive selection LEDs"""
-        # Clear all locomotive LEDs first
+        # Stage all five loco LEDs, then emit one frame - the old
+        # per-LED writes transmitted up to six full RMT frames here
         for i in range(5):  # LEDs 5-9
-            await self._set_led(LED_LOCO_START + i, (0, 0, 0))
-            
+            self._stage_led(LED_LOCO_START + i, _COL_OFF)
+
         # Light up selected locomotive LED
         if selected_index >= 0 and selected_index < 5 and selected_index < total_locos:
             led_index = LED_LOCO_START + selected_index
-            await self._set_led(led_index, (0, 0, self.LED_BRIGHT))  # Bright blue
+            self._stage_led(led_index, _COL_BLUE_BRIGHT)  # Bright blue
             
     async def show_startup_sequence(self):
         """Show startup LED sequence"""
@@ -202,19 +305,24 @@ class AsyncNeoPixelController:
         print("LED startup sequence...")
         
         # Flash WiFi LED orange (initializing)
-        await self._set_led(LED_WIFI, (255, 165, 0), force_update=True)
-        await asyncio.sleep(0.2)
+        await self._set_led(LED_WIFI, _COL_ORANGE_INIT, force_update=True)
+        await _sleep_ms(200)
         
         # Flash RocRail LED orange (initializing) 
-        await self._set_led(LED_ROCRAIL, (255, 165, 0), force_update=True)
-        await asyncio.sleep(0.2)
+        await self._set_led(LED_ROCRAIL, _COL_ORANGE_INIT, force_update=True)
+        await _sleep_ms(200)
         
-        # Quick sweep of locomotive LEDs to show system alive
+        # Quick sweep of locomotive LEDs to show system alive - stage
+        # off+on per step so each visible step is exactly one frame
         for i in range(5):
             led_index = LED_LOCO_START + i
-            await self._set_led(led_index, (0, 0, 100), force_update=True)
-            await asyncio.sleep(0.05)
-            await self._set_led(led_index, (0, 0, 0), force_update=True)
+            if i > 0:
+                self._stage_led(LED_LOCO_START + i - 1, _COL_OFF, force_update=True)
+            self._stage_led(led_index, _COL_BLUE_SWEEP, force_update=True)
+            await self.flush()
+            await _sleep_ms(50)
+        self._stage_led(LED_LOCO_END, _COL_OFF, force_update=True)
+        await self.flush()
             
         print("✓ LED startup complete - ready for status updates")
         
@@ -223,13 +331,14 @@ class AsyncNeoPixelController:
         if not self.enabled:
             return
             
-        # Flash all LEDs red
+        # Flash all LEDs red - stage the whole strip, then one frame
         for _ in range(3):
             for i in range(NEOPIXEL_COUNT):
-                await self._set_led(i, (self.LED_BRIGHT, 0, 0), force_update=True)
-            await asyncio.sleep(0.2)
+                self._stage_led(i, _COL_RED_BRIGHT, force_update=True)
+            await self.flush()
+            await _sleep_ms(200)
             await self._clear_all()
-            await asyncio.sleep(0.2)
+            await _sleep_ms(200)
             
     async def test_all_leds(self):
         """Test all LEDs with different colors"""
@@ -248,19 +357,17 @@ class AsyncNeoPixelController:
         
         for color in colors:
             for i in range(NEOPIXEL_COUNT):
-                await self._set_led(i, color, force_update=True)
-            await asyncio.sleep(0.5)
+                self._stage_led(i, color, force_update=True)
+            await self.flush()
+            await _sleep_ms(500)
             
         await self._clear_all()
         
     async def refresh(self):
         """Refresh LEDs (prevent RMT lockups)"""
         if self.enabled and self.neo:
-            async with self._led_lock:
-                try:
-                    self.neo.write()
-                except:
-                    pass  # Silent error handling
+            self._dirty = True
+            await self.flush()
                     
     def is_enabled(self):
         """Check if LEDs are enabled"""
@@ -4,9 +4,54 @@ Replaces thread-based socket communication with asyncio
 """
 
 import asyncio
+import errno
+import gc
 import json
+import random
+import time
+from collections import deque
 from config import *
 
+# Asyncio capability flags resolved once at import time - probing with
+# hasattr on every call costs an attribute lookup on the connect path
+_HAS_WAIT_FOR = hasattr(asyncio, 'wait_for')
+_HAS_SHIELD = hasattr(asyncio, 'shield')
+
+# MicroPython-only heap probe; None on CPython (dev/test runs)
+_mem_free = getattr(gc, 'mem_free', None)
+
+# Pre-encoded frame templates - bytes %-formatting allocates one object
+# per command where the f-string + encode path built three
+_HDR_TMPL = b'<xmlh><xml size="%d"/></xmlh>%s'
+_HDR_NAMED_TMPL = b'<xmlh><xml size="%d" name="%s"/></xmlh>%s'
+_LC_TMPL = b'<lc id="%s" V="%d" dir="%s"/>'
+_FN_TMPL = b'<fn id="%s" f0="%s" fnchanged="0"/>'
+_KEEPALIVE_BODY = b'<sys cmd="getstate"/>'
+_BOOL_BYTES = {"true": b"true", "false": b"false"}
+
+# Errnos that mean the TCP connection is gone. 128 is ENOTCONN on
+# ESP32/LWIP; the getattr fallbacks cover ports whose errno module
+# omits some names.
+_LOST_ERRNOS = (
+    128,
+    getattr(errno, 'ENOTCONN', 128),
+    getattr(errno, 'ECONNRESET', 104),
+    getattr(errno, 'EPIPE', 32),
+    getattr(errno, 'EBADF', 9),
+)
+
+
+def _conn_lost(e):
+    """Classify an OSError as connection loss by integer errno.
+
+    No str(e) allocation and no substring scans - and no misfire when
+    an unrelated error happens to mention ENOTCONN in its text.
+    """
+    code = getattr(e, 'errno', None)
+    if code is None and e.args:
+        code = e.args[0]
+    return code in _LOST_ERRNOS
+
 
 class AsyncRocrailProtocol:
     """
@@ -27,101 +72,192 @@ class AsyncRocrailProtocol:
         # Protocol state
         self.locomotives_loaded = False
         self.query_pending = False
-        self.xml_buffer = ""
+
+        # Streaming lclist scan state: entries are handed to loco_list
+        # as they complete, so only the tail fragment after the last
+        # complete entry survives between chunks (bounded by one entry,
+        # not the whole multi-KB response)
+        self._lcl_active = False
+        self._lcl_tail = b""
         
-        # Async synchronization
-        self._protocol_lock = asyncio.Lock()
-        self._send_queue = []  # Simple list for MicroPython compatibility
+        # Async synchronization. No lock anywhere: asyncio is
+        # single-threaded, so plain attribute and queue access can't
+        # interleave - the only thing needing serialization is
+        # connect/disconnect re-entrance, which a boolean covers.
+        # deque gives O(1) popleft where list.pop(0) shifted the tail.
+        self._connecting = False
+        self._send_queue = deque((), 64)
         self._queue_event = asyncio.Event()  # Signal when queue has items
         
-        # Connection monitoring
+        # Connection monitoring.  last_activity_time covers both
+        # directions and drives the keep-alive send trigger;
+        # last_rx_time only moves when the server sends us something,
+        # so our own keep-alive frames can't mask a dead link.
         self.last_activity_time = 0
+        self.last_rx_time = 0
         self.reconnect_task = None
+        self.keepalive_task = None
+        # Bound once - the send/receive hot paths stamp activity per
+        # batch/packet and shouldn't pay a global + attribute lookup
+        self._ticks_ms = time.ticks_ms
+
+        # Local mirror of the state manager's rocrail status - the hot
+        # send/receive paths only need "already connected?" and should
+        # not pay a state-manager coroutine hop per packet for it
+        self._status_is_connected = False
+
+        # Selected loco id, re-encoded only when the selection changes
+        self._sel_id_str = None
+        self._sel_id_bytes = b""
+
+        # Reusable receive buffer - readinto (MicroPython stream
+        # extension) fills it in place, so a burst of lclist chunks no
+        # longer allocates a fresh bytes object per read. Sized by
+        # ROCRAIL_RX_CHUNK: a bigger read absorbs more of the initial
+        # lclist burst per scheduler wakeup.
+        self._rx_buf = bytearray(ROCRAIL_RX_CHUNK)
+        self._rx_mv = memoryview(self._rx_buf)
+        self._use_readinto = False
         
+    async def _set_status(self, status):
+        """Forward a status change to the state manager, mirroring the
+        connected flag locally for the per-packet fast path."""
+        self._status_is_connected = (status == "connected")
+        await self.state.set_rocrail_status(status)
+
     async def connect(self, host, port, timeout=10):
         """Connect to RocRail server"""
         self.host = host
         self.port = port
         
-        await self.state.set_rocrail_status("connecting")
-        
-        async with self._protocol_lock:
+        if self._connecting:
+            print("Connect already in progress")
+            return False
+        self._connecting = True
+
+        # Reap the keepalive of a previous connection first - a fast
+        # reconnect inside its 20 s sleep window would otherwise leave
+        # the old instance running alongside the new one, and another
+        # would pile up per reconnect cycle
+        if self.keepalive_task and not self.keepalive_task.done():
+            self.keepalive_task.cancel()
+        self.keepalive_task = None
+
+        await self._set_status("connecting")
+
+        try:
             try:
                 print(f"Connecting to RocRail: {host}:{port}")
                 
                 # Create connection with timeout - MicroPython compatible
-                if hasattr(asyncio, 'wait_for'):
-                    # Standard asyncio with timeout
-                    self.reader, self.writer = await asyncio.wait_for(
-                        asyncio.open_connection(host, port),
-                        timeout=timeout
+                if _HAS_WAIT_FOR:
+                    # Standard asyncio with timeout. Run the connect as
+                    # its own task so a timeout can reap a late result:
+                    # a connection that completes just after the
+                    # deadline would otherwise leak its LWIP socket,
+                    # and a few of those end in EMFILE on reconnect.
+                    conn_task = asyncio.create_task(
+                        asyncio.open_connection(host, port)
                     )
+                    try:
+                        # Shield where available so a timeout does not
+                        # cancel conn_task itself - the reap below can
+                        # then still collect a just-too-late connection
+                        self.reader, self.writer = await asyncio.wait_for(
+                            asyncio.shield(conn_task) if _HAS_SHIELD else conn_task,
+                            timeout
+                        )
+                    except asyncio.TimeoutError:
+                        conn_task.cancel()
+                        try:
+                            _, late_writer = await conn_task
+                            late_writer.close()
+                        except asyncio.CancelledError:
+                            # CancelledError is a BaseException - without
+                            # this clause it would escape the handlers
+                            # below and kill the caller instead of
+                            # surfacing as a connect failure
+                            pass
+                        except Exception:
+                            pass
+                        raise
                 else:
                     # Fallback for MicroPython without wait_for
                     self.reader, self.writer = await asyncio.open_connection(host, port)
-                
-                print("✓ RocRail connected")
-                await self.state.set_rocrail_status("connected")
-                
-                # Start background tasks
-                asyncio.create_task(self._receive_task())
-                asyncio.create_task(self._send_task())
-                
-                return True
-                
+
             except asyncio.TimeoutError:
                 print("RocRail connection timeout")
-                await self.state.set_rocrail_status("failed")
+                await self._set_status("failed")
                 return False
             except Exception as e:
                 print(f"RocRail connection error: {e}")
-                await self.state.set_rocrail_status("failed")
+                await self._set_status("failed")
                 return False
+        finally:
+            self._connecting = False
+
+        # Probe once per connection; CPython streams lack readinto
+        self._use_readinto = hasattr(self.reader, 'readinto')
+
+        print("✓ RocRail connected")
+        await self._set_status("connected")
+
+        # Start background tasks
+        self.last_activity_time = self._ticks_ms()
+        self.last_rx_time = self.last_activity_time
+        asyncio.create_task(self._receive_task())
+        asyncio.create_task(self._send_task())
+        self.keepalive_task = asyncio.create_task(self._keepalive_task())
+
+        return True
                 
     async def disconnect(self):
         """Disconnect from RocRail server"""
-        async with self._protocol_lock:
-            try:
-                if self.writer:
-                    self.writer.close()
-                    # MicroPython compatible - wait_closed may not exist
-                    if hasattr(self.writer, 'wait_closed'):
-                        try:
-                            await self.writer.wait_closed()
-                        except:
-                            pass  # Ignore errors in wait_closed
-                    
-                self.reader = None
-                self.writer = None
-                
-                print("RocRail disconnected")
-                await self.state.set_rocrail_status("disconnected")
-                
-            except Exception as e:
-                print(f"RocRail disconnect error: {e}")
+        try:
+            if self.writer:
+                self.writer.close()
+                # MicroPython compatible - wait_closed may not exist
+                if hasattr(self.writer, 'wait_closed'):
+                    try:
+                        await self.writer.wait_closed()
+                    except:
+                        pass  # Ignore errors in wait_closed
+
+            self.reader = None
+            self.writer = None
+
+            print("RocRail disconnected")
+            await self._set_status("disconnected")
+
+        except Exception as e:
+            print(f"RocRail disconnect error: {e}")
                 
-    async def is_connected(self):
-        """Check if connected to RocRail"""
-        async with self._protocol_lock:
-            # MicroPython compatible connection check
-            return (self.writer is not None and 
-                   self.reader is not None and
-                   hasattr(self.writer, 'write'))
+    def is_connected(self):
+        """Check if connected to RocRail.
+
+        Plain attribute reads need no coordination in single-threaded
+        asyncio - and the old lock made this block for the whole
+        duration of an in-flight connect() attempt.
+        """
+        return self.writer is not None and self.reader is not None
             
             
     async def _auto_reconnect(self):
         """Automatic reconnection with exponential backoff"""
-        retry_delays = [1, 2, 5, 10, 30]  # Seconds between attempts
         attempt = 0
         
         while True:
-            if await self.is_connected():
+            if self.is_connected():
                 print("Already connected, stopping auto-reconnect")
                 break
                 
-            delay = retry_delays[min(attempt, len(retry_delays)-1)]
-            print(f"Auto-reconnect in {delay}s (attempt {attempt+1})")
-            await self.state.set_rocrail_status("reconnecting")
+            # Geometric backoff capped at 30 s, jittered over the upper
+            # half so a layout full of controllers doesn't retry in
+            # lockstep after a shared power/Wi-Fi blink
+            ceiling = min(30, 1 << min(attempt, 5))
+            delay = ceiling / 2 + random.random() * (ceiling / 2)
+            print(f"Auto-reconnect in {delay:.1f}s (attempt {attempt+1})")
+            await self._set_status("reconnecting")
             
             await asyncio.sleep(delay)
             
@@ -174,6 +310,39 @@ class AsyncRocrailProtocol:
             
         return False
         
+    async def _keepalive_task(self):
+        """Bound failure detection on quiet Wi-Fi links.
+
+        TCP alone can take minutes to notice a dead NAT/Wi-Fi path.
+        When nothing has arrived from the server for
+        ROCRAIL_KEEPALIVE_INTERVAL, send a lightweight state query;
+        when it stays silent for twice that, declare the connection
+        lost and start the reconnect loop.  Both checks run against
+        last_rx_time, never last_activity_time - our own writes
+        (including the keep-alive frames this task sends) succeed
+        against a dead NAT path for as long as the socket buffer has
+        room, and would otherwise reset the clock every cycle.
+        """
+        interval = ROCRAIL_KEEPALIVE_INTERVAL
+        while self.writer:
+            await asyncio.sleep(interval / 1000)
+            if not self.writer:
+                break
+            rx_idle = time.ticks_diff(time.ticks_ms(), self.last_rx_time)
+            if rx_idle > 2 * interval:
+                print("Keep-alive timeout - connection presumed dead")
+                await self._set_status("lost")
+                await self.disconnect()
+                if not self.reconnect_task or self.reconnect_task.done():
+                    self.reconnect_task = asyncio.create_task(self._auto_reconnect())
+                break
+            if rx_idle >= interval:
+                # Server quiet for one interval: probe it.  getstate
+                # always draws a reply, so a live link restamps
+                # last_rx_time before the 2x cutoff is reached.
+                await self._send_message(_KEEPALIVE_BODY)
+        print("RocRail keep-alive task ended")
+
     async def _receive_task(self):
         """Background task for receiving data"""
         print("RocRail receive task started")
@@ -185,11 +354,16 @@ class AsyncRocrailProtocol:
                     continue
                     
                 try:
-                    # Read data from socket with timeout
-                    data = await self.reader.read(4096)
+                    # Read into the shared buffer when the port allows;
+                    # fall back to an allocating read otherwise
+                    if self._use_readinto:
+                        n = await self.reader.readinto(self._rx_buf)
+                        data = self._rx_mv[:n] if n else None
+                    else:
+                        data = await self.reader.read(ROCRAIL_RX_CHUNK)
                     if not data:
                         print("RocRail server closed connection")
-                        await self.state.set_rocrail_status("lost")
+                        await self._set_status("lost")
                         await self.disconnect()
                         # Trigger reconnection
                         if not self.reconnect_task or self.reconnect_task.done():
@@ -201,9 +375,9 @@ class AsyncRocrailProtocol:
                     
                 except OSError as e:
                     # Handle socket errors
-                    if "[Errno 128]" in str(e) or "ENOTCONN" in str(e):
+                    if _conn_lost(e):
                         print(f"Receive connection lost: {e}")
-                        await self.state.set_rocrail_status("lost")
+                        await self._set_status("lost")
                         await self.disconnect()
                         # Trigger reconnection
                         if not self.reconnect_task or self.reconnect_task.done():
@@ -215,7 +389,7 @@ class AsyncRocrailProtocol:
                         
         except Exception as e:
             print(f"Receive task error: {e}")
-            await self.state.set_rocrail_status("lost")
+            await self._set_status("lost")
         finally:
             print("RocRail receive task ended")
             
@@ -225,128 +399,190 @@ class AsyncRocrailProtocol:
         
         try:
             while True:
-                # Wait for message to be available in queue
-                await self._queue_event.wait()
-                
-                # Process all queued messages
-                while True:
-                    async with self._protocol_lock:
-                        if not self._send_queue:
-                            self._queue_event.clear()
-                            break
-                        message = self._send_queue.pop(0)
-                    
-                    if not self.writer or not hasattr(self.writer, 'write'):
-                        print("Cannot send - no connection")
-                        await self.state.set_rocrail_status("lost")
-                        # Trigger reconnection
+                # Yield to the scheduler only when the queue is truly
+                # empty; messages appended while a batch was draining
+                # loop straight back without an extra event round-trip
+                q = self._send_queue
+                if not q:
+                    self._queue_event.clear()
+                    await self._queue_event.wait()
+                    continue
+
+                # Drain the whole queue into one buffer - a burst of
+                # throttle frames then costs a single write+drain
+                # round-trip instead of one per message. popleft loop
+                # because MicroPython's deque is not iterable.
+                parts = []
+                while q:
+                    parts.append(q.popleft())
+                batch = b''.join(parts)
+
+                if not self.writer:
+                    print("Cannot send - no connection")
+                    await self._set_status("lost")
+                    # Trigger reconnection
+                    if not self.reconnect_task or self.reconnect_task.done():
+                        self.reconnect_task = asyncio.create_task(self._auto_reconnect())
+                    continue
+
+                try:
+                    # Send the coalesced batch
+                    self.writer.write(batch)
+                    await self.writer.drain()
+
+                    # Update activity time
+                    self.last_activity_time = self._ticks_ms()
+
+                    # Ensure connection status is correct - local flag
+                    # instead of a state-manager round-trip per batch
+                    if not self._status_is_connected:
+                        await self._set_status("connected")
+
+                except OSError as e:
+                    # Handle specific socket errors
+                    if _conn_lost(e):
+                        print(f"Connection lost: {e}")
+                        await self._set_status("lost")
+                        # Close the broken connection
+                        await self.disconnect()
+                        # Trigger immediate reconnection
                         if not self.reconnect_task or self.reconnect_task.done():
                             self.reconnect_task = asyncio.create_task(self._auto_reconnect())
-                        continue
-                        
-                    try:
-                        # Send message
-                        self.writer.write(message)
-                        await self.writer.drain()
-                        
-                        # Update activity time
-                        import time
-                        self.last_activity_time = time.ticks_ms()
-                        
-                        # Ensure connection status is correct
-                        if await self.state.get_rocrail_status() != "connected":
-                            await self.state.set_rocrail_status("connected")
-                            
-                    except OSError as e:
-                        # Handle specific socket errors
-                        if "[Errno 128]" in str(e) or "ENOTCONN" in str(e):
-                            print(f"Connection lost: {e}")
-                            await self.state.set_rocrail_status("lost")
-                            # Close the broken connection
-                            await self.disconnect()
-                            # Trigger immediate reconnection
-                            if not self.reconnect_task or self.reconnect_task.done():
-                                self.reconnect_task = asyncio.create_task(self._auto_reconnect())
-                        else:
-                            print(f"Send error: {e}")
-                            await self.state.set_rocrail_status("error")
-                    except Exception as e:
+                    else:
                         print(f"Send error: {e}")
-                        await self.state.set_rocrail_status("lost")
-                
+                        await self._set_status("error")
+                except Exception as e:
+                    print(f"Send error: {e}")
+                    await self._set_status("lost")
+
         except Exception as e:
             print(f"Send task error: {e}")
         finally:
             print("RocRail send task ended")
             
     async def _handle_received_data(self, data):
-        """Process received data from RocRail"""
-        try:
-            data_str = data.decode('utf-8')
-        except:
-            data_str = str(data)
-            
+        """Process received data from RocRail.
+
+        Stays in bytes end-to-end - decoding a multi-KB lclist burst to
+        str doubled its RAM footprint and burned CPU on UTF-8 validation
+        for data that is scanned bytewise anyway. Only the matched
+        attribute values are decoded, at extraction time.
+        """
         # Update activity time
-        import time
-        self.last_activity_time = time.ticks_ms()
-        
-        # Update connection status if needed
-        if await self.state.get_rocrail_status() != "connected":
-            await self.state.set_rocrail_status("connected")
+        self.last_activity_time = self._ticks_ms()
+        self.last_rx_time = self.last_activity_time
+
+        # Update connection status if needed - checked on every packet,
+        # so read the local mirror instead of awaiting the state manager
+        if not self._status_is_connected:
+            await self._set_status("connected")
             
         # Handle locomotive list loading
         if not self.locomotives_loaded:
-            await self._process_locomotive_data(data_str)
+            await self._process_locomotive_data(data)
             
-    async def _process_locomotive_data(self, data_str):
-        """Process locomotive list data"""
-        # Add to buffer
-        self.xml_buffer += data_str
-        
-        # Check for complete locomotive list
-        if '<lclist>' in self.xml_buffer and '</lclist>' in self.xml_buffer:
+    async def _process_locomotive_data(self, data):
+        """Incrementally scan the lclist stream for <lc> entries.
+
+        Each complete entry is fed to loco_list immediately; the old
+        approach accumulated the whole response in a str (O(N^2) from
+        the re-concatenation and re-scanning per chunk, with a multi-KB
+        RAM spike right before parsing).
+        """
+        # memoryview has no find(); one plain byte copy replaces the
+        # old full decode
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        buf = self._lcl_tail + data
+
+        if not self._lcl_active:
+            start = buf.find(b'<lclist>')
+            if start == -1:
+                # Keep a short overlap so a sentinel split across two
+                # chunks is still found
+                self._lcl_tail = buf[-12:]
+                return
             print("Processing locomotive list...")
-            
-            try:
-                # Parse locomotive list
-                if self.loco_list.update_from_rocrail_response(self.xml_buffer):
-                    print("✓ Locomotives loaded from RocRail")
-                    self.locomotives_loaded = True
-                    self.query_pending = False
-                    
-                    # Clear buffer to save memory
-                    self.xml_buffer = ""
-                    
-                    # Run garbage collection
-                    import gc
-                    gc.collect()
-                    
+            self.loco_list.begin_update()
+            self._lcl_active = True
+            buf = buf[start + 8:]
+
+        end = buf.find(b'</lclist>')
+        done = end != -1
+        rest = buf[:end] if done else buf
+
+        try:
+            pos = 0
+            while True:
+                lc_pos = rest.find(b'<lc ', pos)
+                if lc_pos == -1:
+                    pos = len(rest)
+                    break
+                entry_end = rest.find(b'/>', lc_pos)
+                next_lc = rest.find(b'<lc ', lc_pos + 4)
+                if entry_end != -1 and (next_lc == -1 or entry_end < next_lc):
+                    self.loco_list.feed_entry(rest[lc_pos:entry_end + 2])
+                    pos = entry_end + 2
+                elif next_lc != -1:
+                    self.loco_list.feed_entry(rest[lc_pos:next_lc])
+                    pos = next_lc
+                elif done:
+                    self.loco_list.feed_entry(rest[lc_pos:])
+                    pos = len(rest)
+                    break
                 else:
-                    print("Failed to parse locomotive list")
-                    
-            except Exception as e:
-                print(f"Locomotive parsing error: {e}")
-                
-        # Prevent buffer from growing too large
-        elif len(self.xml_buffer) > 16384:
-            # Try to preserve locomotive list data
-            lclist_start = self.xml_buffer.find('<lclist>')
-            if lclist_start != -1:
-                self.xml_buffer = self.xml_buffer[lclist_start:]
+                    # Entry still incomplete - wait for the next chunk
+                    pos = lc_pos
+                    break
+        except Exception as e:
+            print(f"Locomotive parsing error: {e}")
+
+        if done:
+            self._lcl_active = False
+            self._lcl_tail = b""
+            if self.loco_list.finish_update():
+                print("✓ Locomotives loaded from RocRail")
+                self.locomotives_loaded = True
+                self.query_pending = False
             else:
-                self.xml_buffer = self.xml_buffer[-4096:]  # Keep last 4KB
+                print("Failed to parse locomotive list")
+            # Collect only under real pressure - a full MicroPython GC
+            # sweep costs tens of ms and the scanner allocates little
+            if _mem_free is not None and _mem_free() < 4096:
+                gc.collect()
+        else:
+            # Unconsumed fragment only; keep a short overlap when it is
+            # entry-free so split tags are still caught
+            tail = rest[pos:] if pos < len(rest) else rest[-12:]
+            self._lcl_tail = tail
                 
-    async def _send_message(self, message):
-        """Queue message for sending"""
+    def _selected_id_bytes(self):
+        """Selected loco id as bytes, re-encoded only on selection change"""
+        id_str = self.loco_list.get_selected_id()
+        if not id_str:
+            return None
+        if id_str != self._sel_id_str:
+            self._sel_id_str = id_str
+            self._sel_id_bytes = id_str.encode()
+        return self._sel_id_bytes
+
+    async def _send_message(self, message, xml_name=None):
+        """Queue message for sending (str or pre-encoded bytes body).
+
+        xml_name optionally adds the header's name attribute (RocRail
+        wants name="model" on model queries).
+        """
         try:
-            # Create XML message with header
-            message_len = len(message)
-            full_message = f'<xmlh><xml size="{message_len}"/></xmlh>{message}'
-            
-            # Queue for sending using list and event
-            async with self._protocol_lock:
-                self._send_queue.append(full_message.encode())
-                self._queue_event.set()
+            if isinstance(message, str):
+                message = message.encode()
+            if xml_name:
+                full_message = _HDR_NAMED_TMPL % (len(message), xml_name, message)
+            else:
+                full_message = _HDR_TMPL % (len(message), message)
+
+            # No lock needed - single-threaded scheduler, O(1) append
+            self._send_queue.append(full_message)
+            self._queue_event.set()
             
             return True
             
@@ -356,56 +592,39 @@ class AsyncRocrailProtocol:
             
     async def send_speed_direction(self, speed, direction):
         """Send locomotive speed and direction command"""
-        current_loco_id = self.loco_list.get_selected_id()
-        if not current_loco_id:
+        loco_id = self._selected_id_bytes()
+        if not loco_id:
             return False
-            
-        message = f'<lc id="{current_loco_id}" V="{speed}" dir="{direction}"/>'
-        return await self._send_message(message)
+
+        body = _LC_TMPL % (loco_id, speed, _BOOL_BYTES.get(direction, b"true"))
+        return await self._send_message(body)
         
     async def send_light_command(self, light_on_off):
         """Send locomotive light command"""
-        current_loco_id = self.loco_list.get_selected_id()
-        if not current_loco_id:
+        loco_id = self._selected_id_bytes()
+        if not loco_id:
             return False
-            
-        message = f'<fn id="{current_loco_id}" f0="{light_on_off}" fnchanged="0"/>'
-        return await self._send_message(message)
+
+        body = _FN_TMPL % (loco_id, _BOOL_BYTES.get(light_on_off, b"false"))
+        return await self._send_message(body)
         
     async def query_locomotives(self):
         """Query all locomotives from RocRail server"""
         print("Querying locomotives...")
         
         self.query_pending = True
-        message = '<model cmd="lclist"/>'
-        
-        # Send query with special header
-        try:
-            message_len = len(message)
-            full_message = f'<xmlh><xml size="{message_len}" name="model"/></xmlh>{message}'
-            
-            # Queue for sending using list and event
-            async with self._protocol_lock:
-                self._send_queue.append(full_message.encode())
-                self._queue_event.set()
-            
+        if await self._send_message(b'<model cmd="lclist"/>', xml_name=b"model"):
             print("Locomotive query sent")
             return True
-            
-        except Exception as e:
-            print(f"Query error: {e}")
-            self.query_pending = False
-            return False
+        self.query_pending = False
+        return False
             
     async def get_connection_info(self):
         """Get connection information"""
-        async with self._protocol_lock:
-            return {
-                'connected': (self.writer is not None and 
-                             self.reader is not None and
-                             hasattr(self.writer, 'write')),
-                'host': self.host,
-                'port': self.port,
-                'locomotives_loaded': self.locomotives_loaded,
-                'last_activity': self.last_activity_time
-            }
+        return {
+            'connected': self.is_connected(),
+            'host': self.host,
+            'port': self.port,
+            'locomotives_loaded': self.locomotives_loaded,
+            'last_activity': self.last_activity_time
+        }
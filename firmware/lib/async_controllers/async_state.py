@@ -7,47 +7,114 @@ import asyncio
 import time
 
 
+# Reason bits for the fused safety event (poti must be zeroed)
+REASON_LOCO = 1
+REASON_DIR = 2
+REASON_ESTOP = 4
+
+# Status codes for the packed state word: wifi in bits 0-2, rocrail in
+# bits 3-5, speed-enabled in bit 6. One int compare then replaces three
+# string compares in has_status_changed. Every status the setters ever
+# receive needs a distinct code here, or transitions between the missing
+# ones collapse onto the same word and go undetected.
+_WIFI_CODES = {
+    "initial": 0,
+    "connecting": 1,
+    "connected": 2,
+    "failed": 3,
+    "disconnected": 4,
+}
+_ROCRAIL_CODES = {
+    "disconnected": 0,
+    "connecting": 1,
+    "connected": 2,
+    "lost": 3,
+    "reconnecting": 4,
+    "failed": 5,
+    "error": 6,
+}
+_SPEED_BIT = 1 << 6
+
+# Deferred-log event codes: print() blocks until the UART FIFO drains
+# (~1 ms per line), so transition setters queue one byte here and the
+# drain_log coroutine does the formatting and writing off the hot path.
+# High nibble selects the kind, low bits carry the status code.
+_LOG_WIFI = 0x10
+_LOG_ROCRAIL = 0x20
+_LOG_SPEED_ON = 0x01
+_LOG_SPEED_OFF = 0x02
+# Reverse lookup for drain_log - must stay index-aligned with the code
+# tables above or the deferred logger reports the wrong status
+_WIFI_NAMES = ("initial", "connecting", "connected", "failed", "disconnected")
+_ROCRAIL_NAMES = (
+    "disconnected",
+    "connecting",
+    "connected",
+    "lost",
+    "reconnecting",
+    "failed",
+    "error",
+)
+
+
 class AsyncControllerState:
     """
     Async state management using asyncio primitives
     Replaces global variables and manual state tracking
     """
-    
+
     def __init__(self):
         # State variables with asyncio protection
         self._wifi_status = "initial"  # "initial", "connecting", "connected", "failed"
         self._rocrail_status = "disconnected"  # "disconnected", "connecting", "connected", "lost", "reconnecting"
         self._speed_enabled = True
         
-        # Asyncio synchronization primitives
-        self._state_lock = asyncio.Lock()
+        # Asyncio synchronization primitives.  No Lock: the event loop is
+        # cooperative and none of the read-modify-write sections below
+        # contain an await, so plain attribute access is already atomic.
         self._wifi_changed = asyncio.Event()
         self._rocrail_changed = asyncio.Event()
         self._speed_changed = asyncio.Event()
+        # Fires on any WiFi/RocRail/speed transition so display code can
+        # await instead of polling has_status_changed
+        self._status_changed = asyncio.Event()
+
+        # Fused safety event: locomotive change, direction change and
+        # emergency stop all require the same reaction (zero the poti),
+        # so one Event plus a reason bitmask replaces three Events
+        self._safety_event = asyncio.Event()
+        self._safety_reason = 0
+
+        # Set while WiFi and RocRail are both "connected"; maintained by
+        # the status setters so waiters block on the Event instead of polling
+        self._system_ready = asyncio.Event()
         
-        # Event signaling for state changes
-        self._locomotive_changed = asyncio.Event()
-        self._direction_changed = asyncio.Event()
-        self._emergency_stop = asyncio.Event()
-        
-        # Status change tracking
-        self._last_wifi_status = None
-        self._last_rocrail_status = None
-        self._last_speed_enabled = None
+        # Status change tracking via the packed state word; -1 forces
+        # the first has_status_changed call to report a change
+        self._state_word = _SPEED_BIT  # initial wifi=0, disconnected=0, speed on
+        self._last_state_word = -1
+
+        # Ring of pending log event codes (power-of-two size for the
+        # cheap index mask); overflow drops the oldest entries
+        self._log = bytearray(64)
+        self._log_head = 0
+        self._log_tail = 0
+        self._log_event = asyncio.Event()
         
     async def get_wifi_status(self):
-        """Get current WiFi status (thread-safe)"""
-        async with self._state_lock:
-            return self._wifi_status
+        """Get current WiFi status"""
+        return self._wifi_status
             
     async def set_wifi_status(self, status):
         """Set WiFi status and signal change"""
-        async with self._state_lock:
-            if self._wifi_status != status:
-                old_status = self._wifi_status
-                self._wifi_status = status
-                print(f"WiFi: {old_status} -> {status}")
-                self._wifi_changed.set()
+        if self._wifi_status != status:
+            code = _WIFI_CODES.get(status, 0)
+            self._wifi_status = status
+            self._log_code(_LOG_WIFI | code)
+            self._state_word = (self._state_word & ~0b111) | code
+            self._wifi_changed.set()
+            self._status_changed.set()
+            self._update_system_ready()
                 
     async def wait_wifi_change(self):
         """Wait for WiFi status change"""
@@ -55,45 +122,56 @@ class AsyncControllerState:
         self._wifi_changed.clear()
         
     async def get_rocrail_status(self):
-        """Get current RocRail status (thread-safe)"""
-        async with self._state_lock:
-            return self._rocrail_status
+        """Get current RocRail status"""
+        return self._rocrail_status
             
     async def set_rocrail_status(self, status):
         """Set RocRail status and signal change"""
-        async with self._state_lock:
-            if self._rocrail_status != status:
-                old_status = self._rocrail_status
-                self._rocrail_status = status
-                print(f"RocRail: {old_status} -> {status}")
-                self._rocrail_changed.set()
+        if self._rocrail_status != status:
+            code = _ROCRAIL_CODES.get(status, 0)
+            self._rocrail_status = status
+            self._log_code(_LOG_ROCRAIL | code)
+            self._state_word = (self._state_word & ~0b111000) | (code << 3)
+            self._rocrail_changed.set()
+            self._status_changed.set()
+            self._update_system_ready()
                 
     async def wait_rocrail_change(self):
         """Wait for RocRail status change"""
         await self._rocrail_changed.wait()
         self._rocrail_changed.clear()
         
+    def speed_enabled(self):
+        """Speed-enable flag as a plain read - no coroutine per tick"""
+        return self._speed_enabled
+
     async def is_speed_enabled(self):
-        """Check if speed sending is enabled (thread-safe)"""
-        async with self._state_lock:
-            return self._speed_enabled
+        """Check if speed sending is enabled"""
+        return self._speed_enabled
             
     async def enable_speed_sending(self):
         """Enable speed sending"""
-        async with self._state_lock:
-            if not self._speed_enabled:
-                self._speed_enabled = True
-                print("Speed sending enabled")
-                self._speed_changed.set()
+        if not self._speed_enabled:
+            self._speed_enabled = True
+            self._state_word |= _SPEED_BIT
+            self._log_code(_LOG_SPEED_ON)
+            self._speed_changed.set()
+            self._status_changed.set()
                 
     async def disable_speed_sending(self):
         """Disable speed sending (safety mechanism)"""
-        async with self._state_lock:
-            if self._speed_enabled:
-                self._speed_enabled = False
-                print("Speed sending disabled - POTI ZERO REQUIRED")
-                self._speed_changed.set()
+        if self._speed_enabled:
+            self._speed_enabled = False
+            self._state_word &= ~_SPEED_BIT
+            self._log_code(_LOG_SPEED_OFF)
+            self._speed_changed.set()
+            self._status_changed.set()
                 
+    async def wait_status_changed(self):
+        """Wait for any WiFi/RocRail/speed status transition (edge-triggered)"""
+        await self._status_changed.wait()
+        self._status_changed.clear()
+
     async def wait_speed_change(self):
         """Wait for speed enable state change"""
         await self._speed_changed.wait()
@@ -102,66 +180,92 @@ class AsyncControllerState:
     # Event signaling methods
     async def signal_locomotive_changed(self):
         """Signal locomotive selection changed"""
-        await self.disable_speed_sending()
-        self._locomotive_changed.set()
-        
-    async def wait_locomotive_changed(self):
-        """Wait for locomotive change event"""
-        await self._locomotive_changed.wait()
-        self._locomotive_changed.clear()
-        
+        self._signal_safety(REASON_LOCO)
+
     async def signal_direction_changed(self):
         """Signal direction changed"""
-        await self.disable_speed_sending()
-        self._direction_changed.set()
-        
-    async def wait_direction_changed(self):
-        """Wait for direction change event"""
-        await self._direction_changed.wait()
-        self._direction_changed.clear()
-        
+        self._signal_safety(REASON_DIR)
+
     async def signal_emergency_stop(self):
         """Signal emergency stop"""
-        await self.disable_speed_sending()
-        self._emergency_stop.set()
-        
-    async def wait_emergency_stop(self):
-        """Wait for emergency stop event"""
-        await self._emergency_stop.wait()
-        self._emergency_stop.clear()
+        self._signal_safety(REASON_ESTOP)
+
+    def _signal_safety(self, reason):
+        """Disable speed sending and fire the fused safety event.
+
+        One synchronous block - awaiting disable_speed_sending from the
+        signal coroutines would add a suspension point per signal for
+        state that lives on the same loop.
+        """
+        if self._speed_enabled:
+            self._speed_enabled = False
+            self._state_word &= ~_SPEED_BIT
+            self._log_code(_LOG_SPEED_OFF)
+            self._speed_changed.set()
+            self._status_changed.set()
+        self._safety_reason |= reason
+        self._safety_event.set()
+
+    async def wait_safety_event(self):
+        """Wait for any safety signal; returns the accumulated reason bitmask"""
+        await self._safety_event.wait()
+        reason = self._safety_reason
+        self._safety_reason = 0
+        self._safety_event.clear()
+        return reason
         
     async def get_system_status(self):
         """Get comprehensive system status"""
-        async with self._state_lock:
-            return {
-                'wifi_connected': self._wifi_status == "connected",
-                'rocrail_connected': self._rocrail_status == "connected", 
-                'speed_enabled': self._speed_enabled,
-                'system_ready': (self._wifi_status == "connected" and 
-                               self._rocrail_status == "connected" and 
-                               self._speed_enabled)
-            }
+        return {
+            'wifi_connected': self._wifi_status == "connected",
+            'rocrail_connected': self._rocrail_status == "connected", 
+            'speed_enabled': self._speed_enabled,
+            'system_ready': (self._wifi_status == "connected" and 
+                           self._rocrail_status == "connected" and 
+                           self._speed_enabled)
+        }
             
     async def has_status_changed(self):
         """Check if any status changed since last call"""
-        async with self._state_lock:
-            changed = (
-                self._last_wifi_status != self._wifi_status or
-                self._last_rocrail_status != self._rocrail_status or
-                self._last_speed_enabled != self._speed_enabled
-            )
-            
-            # Update last known states
-            self._last_wifi_status = self._wifi_status
-            self._last_rocrail_status = self._rocrail_status
-            self._last_speed_enabled = self._speed_enabled
-            
-            return changed
+        word = self._state_word
+        if word != self._last_state_word:
+            self._last_state_word = word
+            return True
+        return False
             
+    def _log_code(self, code):
+        """Queue one status event byte for the drain_log coroutine"""
+        self._log[self._log_head & 63] = code
+        self._log_head += 1
+        if self._log_head - self._log_tail > 64:
+            self._log_tail = self._log_head - 64
+        self._log_event.set()
+
+    async def drain_log(self):
+        """Print queued status transitions outside the hot path"""
+        while True:
+            await self._log_event.wait()
+            self._log_event.clear()
+            while self._log_tail != self._log_head:
+                code = self._log[self._log_tail & 63]
+                self._log_tail += 1
+                kind = code & 0xF0
+                if kind == _LOG_WIFI:
+                    print("WiFi ->", _WIFI_NAMES[code & 0x0F])
+                elif kind == _LOG_ROCRAIL:
+                    print("RocRail ->", _ROCRAIL_NAMES[code & 0x0F])
+                elif code == _LOG_SPEED_ON:
+                    print("Speed sending enabled")
+                elif code == _LOG_SPEED_OFF:
+                    print("Speed sending disabled - POTI ZERO REQUIRED")
+
+    def _update_system_ready(self):
+        """Keep the readiness Event in sync with the connection statuses"""
+        if self._wifi_status == "connected" and self._rocrail_status == "connected":
+            self._system_ready.set()
+        else:
+            self._system_ready.clear()
+
     async def wait_system_ready(self):
         """Wait until system is ready (WiFi + RocRail connected)"""
-        while True:
-            status = await self.get_system_status()
-            if status['wifi_connected'] and status['rocrail_connected']:
-                return
-            await asyncio.sleep(0.1)
+        await self._system_ready.wait()
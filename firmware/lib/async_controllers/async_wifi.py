@@ -7,7 +7,22 @@ import asyncio
 import network
 import time
 import ujson as json  # MicroPython compatible
-import os
+
+# Module-level ticks aliases: one LOAD_GLOBAL instead of LOAD_GLOBAL +
+# LOAD_ATTR per call in the connect/reconnect wait loops
+_ticks_ms = time.ticks_ms
+_ticks_diff = time.ticks_diff
+_ticks_add = time.ticks_add
+
+# How long scan results stay fresh enough to reuse between reconnects
+_SCAN_CACHE_MS = 60000
+
+# Millisecond sleep without float arithmetic where available (MicroPython)
+if hasattr(asyncio, "sleep_ms"):
+    _sleep_ms = asyncio.sleep_ms
+else:
+    async def _sleep_ms(ms):
+        await asyncio.sleep(ms / 1000)
 
 
 class AsyncWiFiManager:
@@ -29,21 +44,39 @@ class AsyncWiFiManager:
         # Async synchronization
         self._wifi_lock = asyncio.Lock()
 
+        # Scan result cache - wlan.scan() blocks the whole event loop
+        # for ~2 s on ESP32, so back-to-back reconnect attempts reuse
+        # recent results instead of re-paying the scan
+        self._scan_cache = None
+        self._scan_time = 0
+
+        # Cached link state - wlan.isconnected()/ifconfig() cross into
+        # the network C module (a driver query on ESP32), so readers get
+        # the memoized values; is_connected() reconciles them against
+        # the driver when the monitor task calls it
+        self._cached_connected = False
+        self._cached_ip = None
+
     async def _load_known_networks(self, filename="wifi_networks.txt"):
         """Load known networks from JSON file"""
-        try:
-            if not self.known_networks:
-                if filename in os.listdir():
-                    with open(filename, "r") as f:
-                        self.known_networks = json.load(f)
-                else:
-                    print("WiFi: No known networks file found.")
-                    self.known_networks = []
+        # None = not loaded yet; [] = loaded (possibly empty). The
+        # distinction stops reconnect attempts from re-reading flash
+        # when the file legitimately holds no entries.
+        if self.known_networks is not None:
             return self.known_networks
+        try:
+            # Open directly instead of probing os.listdir() - the listdir
+            # scan enumerates the whole flash directory just to test one
+            # file, while a failed open is a single OSError
+            with open(filename, "r") as f:
+                self.known_networks = json.load(f)
+        except OSError:
+            print("WiFi: No known networks file found.")
+            self.known_networks = []
         except Exception as e:
             print(f"WiFi: Failed to load known networks: {e}")
             self.known_networks = []
-            return []
+        return self.known_networks
 
     async def _select_best_network(self):
         """Scan and select the strongest known network"""
@@ -53,29 +86,41 @@ class AsyncWiFiManager:
                 print("WiFi: No known networks to connect.")
                 return None, None
 
-            scan_results = self.wlan.scan()
+            # Known list is tiny (1-4 entries) while a busy 2.4 GHz band
+            # returns 20-40 scan hits - build the known lookup once and
+            # track the best match in a single pass over the scan, so
+            # non-matching SSIDs cost one dict probe and no candidate
+            # list or max(key=...) pass is needed
+            known = {e.get("ssid"): e.get("password") for e in self.known_networks}
+
+            # Quarantine the blocking scan: park speed sending first so a
+            # 2 s loop stall cannot leave a stale speed command active,
+            # and serve from the cache while it is fresh
+            now = _ticks_ms()
+            if self._scan_cache is not None and _ticks_diff(now, self._scan_time) < _SCAN_CACHE_MS:
+                scan_results = self._scan_cache
+            else:
+                await self.state.disable_speed_sending()
+                scan_results = self.wlan.scan()
+                self._scan_cache = scan_results
+                self._scan_time = now
             # scan_results: list of tuples (ssid, bssid, channel, RSSI, security, hidden)
-            available = {}
+            best_ssid = None
+            best_password = None
+            best_rssi = -999
             for net in scan_results:
                 ssid = net[0].decode() if isinstance(net[0], bytes) else net[0]
-                rssi = net[3]
-                available[ssid] = rssi
+                if ssid in known and net[3] > best_rssi:
+                    best_rssi = net[3]
+                    best_ssid = ssid
+                    best_password = known[ssid]
 
-            # Find matching SSIDs
-            candidates = []
-            for entry in self.known_networks:
-                ssid = entry.get("ssid")
-                if ssid in available:
-                    candidates.append((ssid, entry.get("password"), available[ssid]))
-
-            if not candidates:
+            if best_ssid is None:
                 print("WiFi: No known networks found in scan.")
                 return None, None
 
-            # Select the one with highest RSSI
-            best = max(candidates, key=lambda x: x[2])
-            print(f"WiFi: Selected network '{best[0]}' with RSSI {best[2]}")
-            return best[0], best[1]
+            print(f"WiFi: Selected network '{best_ssid}' with RSSI {best_rssi}")
+            return best_ssid, best_password
         except Exception as e:
             print(f"WiFi: Error selecting best network: {e}")
             return None, None
@@ -86,7 +131,9 @@ class AsyncWiFiManager:
             try:
                 self.wlan = network.WLAN(network.STA_IF)
                 self.wlan.active(True)
-                await asyncio.sleep(0.5)
+                # Real settle time, not a yield: the ESP32 driver needs
+                # ~100 ms after active(True) before scan/connect work
+                await _sleep_ms(100)
                 return True
             except Exception as e:
                 print(f"WiFi init error: {e}")
@@ -99,11 +146,16 @@ class AsyncWiFiManager:
         if not self.wlan:
             await self.initialize()
 
-        async with self._wifi_lock:
-            try:
+        try:
+            # Hold the lock only for the connection kickoff, not for the
+            # join itself - otherwise status readers block for the whole
+            # (up to 30 s) wait
+            async with self._wifi_lock:
                 # Check if already connected
                 if self.wlan.isconnected():
-                    print(f"WiFi already connected: {self.wlan.ifconfig()[0]}")
+                    self._cached_connected = True
+                    self._cached_ip = self.wlan.ifconfig()[0]
+                    print(f"WiFi already connected: {self._cached_ip}")
                     await self.state.set_wifi_status("connected")
                     return True
 
@@ -120,27 +172,34 @@ class AsyncWiFiManager:
                 # Start connection
                 self.wlan.connect(self.ssid, self.password)
 
-                # Wait for connection with timeout - MicroPython compatible
-                start_time = time.ticks_ms()
-                timeout_ms = timeout_seconds * 1000
-                while not self.wlan.isconnected():
-                    if time.ticks_diff(time.ticks_ms(), start_time) > timeout_ms:
-                        print("WiFi connection timeout")
-                        await self.state.set_wifi_status("failed")
-                        return False
+            # Wait for connection with timeout, lock released. 250 ms
+            # matches ESP32 auth/DHCP timescales - 100 ms polling just
+            # burned scheduler wakeups without joining any faster.
+            deadline = _ticks_add(_ticks_ms(), timeout_seconds * 1000)
+            while not self.wlan.isconnected():
+                if _ticks_diff(deadline, _ticks_ms()) <= 0:
+                    print("WiFi connection timeout")
+                    self._cached_connected = False
+                    self._cached_ip = None
+                    await self.state.set_wifi_status("failed")
+                    return False
 
-                    await asyncio.sleep(0.1)
+                await _sleep_ms(250)
 
-                # Connection successful
-                ip = self.wlan.ifconfig()[0]
-                print(f"✓ WiFi connected: {ip}")
-                await self.state.set_wifi_status("connected")
-                return True
+            # Connection successful
+            ip = self.wlan.ifconfig()[0]
+            self._cached_connected = True
+            self._cached_ip = ip
+            print(f"✓ WiFi connected: {ip}")
+            await self.state.set_wifi_status("connected")
+            return True
 
-            except Exception as e:
-                print(f"WiFi connection error: {e}")
-                await self.state.set_wifi_status("failed")
-                return False
+        except Exception as e:
+            print(f"WiFi connection error: {e}")
+            self._cached_connected = False
+            self._cached_ip = None
+            await self.state.set_wifi_status("failed")
+            return False
 
     async def disconnect(self):
         """Disconnect from WiFi"""
@@ -152,46 +211,74 @@ class AsyncWiFiManager:
                     
                 if self.wlan:
                     self.wlan.active(False)
-                    
+
+                self._cached_connected = False
+                self._cached_ip = None
                 await self.state.set_wifi_status("disconnected")
                 
             except Exception as e:
                 print(f"WiFi disconnect error: {e}")
                 
+    def connected(self):
+        """Last known connection state - no driver query, O(1)"""
+        return self._cached_connected
+
     async def is_connected(self):
-        """Check if WiFi is connected"""
-        async with self._wifi_lock:
-            try:
-                return self.wlan and self.wlan.isconnected()
-            except Exception as e:
-                print(f"WiFi status check error: {e}")
-                return False
-                
+        """Check if WiFi is connected (queries the driver, updates cache)"""
+        # No lock: the driver calls are atomic C calls with no await
+        # between them, so this can run even while connect() waits
+        try:
+            live = bool(self.wlan and self.wlan.isconnected())
+            if live != self._cached_connected:
+                self._cached_connected = live
+                self._cached_ip = self.wlan.ifconfig()[0] if live else None
+            return live
+        except Exception as e:
+            print(f"WiFi status check error: {e}")
+            return False
+
     async def get_ip(self):
-        """Get current IP address"""
+        """Get current IP address (from cache)"""
+        return self._cached_ip
+                
+    async def soft_reset(self):
+        """Drop the association without restarting the driver.
+
+        network.WLAN(STA_IF) is a singleton on ESP32 - the only real
+        effect of a full reset_interface is the active(False)/active(True)
+        driver restart, which costs well over a second. Most recoverable
+        failures (auth reject, DHCP flake) just need a fresh connect.
+        """
         async with self._wifi_lock:
             try:
-                if self.wlan and self.wlan.isconnected():
-                    return self.wlan.ifconfig()[0]
-                return None
+                self._cached_connected = False
+                self._cached_ip = None
+                if self.wlan:
+                    self.wlan.disconnect()
+                return True
             except Exception as e:
-                print(f"IP get error: {e}")
-                return None
-                
+                print(f"WiFi soft reset error: {e}")
+                return False
+
     async def reset_interface(self):
-        """Reset WiFi interface for error recovery"""
+        """Reset WiFi interface for error recovery (full driver restart)"""
         async with self._wifi_lock:
             try:
                 print("Resetting WiFi interface...")
-                
+
+                self._cached_connected = False
+                self._cached_ip = None
                 if self.wlan:
                     self.wlan.disconnect()
                     self.wlan.active(False)
+                    # Genuine teardown wait - deactivation must complete
+                    # before the driver accepts active(True) again
                     await asyncio.sleep(1)
-                    
+
                 self.wlan = network.WLAN(network.STA_IF)
                 self.wlan.active(True)
-                await asyncio.sleep(0.5)
+                # Same ~100 ms post-active(True) settle as initialize()
+                await _sleep_ms(100)
                 
                 print("WiFi interface reset complete")
                 return True
@@ -215,11 +302,13 @@ class AsyncWiFiManager:
         if await self.connect(timeout_seconds=10):
             return True
 
-        # Try with interface reset
+        # Escalating resets: disconnect-only first, full driver restart
+        # only if that did not help
         for attempt in range(max_attempts):
             print(f"WiFi reconnection attempt {attempt + 1}/{max_attempts}")
 
-            if await self.reset_interface():
+            reset = self.soft_reset if attempt == 0 else self.reset_interface
+            if await reset():
                 if await self.connect(timeout_seconds=15):
                     return True
 
@@ -230,11 +319,10 @@ class AsyncWiFiManager:
         
     async def get_signal_strength(self):
         """Get WiFi signal strength (RSSI)"""
-        async with self._wifi_lock:
-            try:
-                if self.wlan and self.wlan.isconnected():
-                    return self.wlan.status('rssi')
-                return None
-            except Exception as e:
-                print(f"Signal strength error: {e}")
-                return None
+        try:
+            if self.wlan and self.wlan.isconnected():
+                return self.wlan.status('rssi')
+            return None
+        except Exception as e:
+            print(f"Signal strength error: {e}")
+            return None
@@ -1,6 +1,28 @@
 # lib/loco_list.py
 import json
-import gc
+import struct
+
+# const() lets the MicroPython compiler drop the gated debug prints at
+# bytecode level; the fallback keeps the module importable on CPython
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+# Parse-path debug chatter. Writing to the REPL UART at 115200 baud
+# serialises the parse loop (~1 ms per line), so per-entry prints are
+# compiled out unless this is flipped on.
+_DEBUG = const(0)
+
+# Persistence magic for the packed binary list format; files without it
+# are treated as legacy JSON and migrated on the next save
+_FILE_MAGIC = b'LL1'
+
+# Attribute names that mark a locomotive definition vs. a pure status
+# update - used by the one-pass entry classifier
+_DEF_ATTRS = ('image', 'roadname', 'desc', 'dectype', 'owner', 'color', 'number')
+_STAT_ATTRS = ('V', 'dir', 'server', 'placing', 'runtime', 'throttleid')
 
 class LocoList:
     """Manages a list of locomotives with selection functionality"""
@@ -15,7 +37,14 @@ class LocoList:
         self.locomotives = []
         self.selected_index = 0
         self.max_locos = 5  # Limited by NeoPixel LEDs (1-5)
-        
+
+        # Streaming update state (begin_update/feed_entry/finish_update)
+        self._pending = None
+        self._pending_ids = None
+
+        # Parallel id set for O(1) duplicate checks during bulk ingest
+        self._id_set = set()
+
         # Try to load existing list
         self.load_from_file()
     
@@ -30,16 +59,16 @@ class LocoList:
             loco_name = loco_id
             
         # Check if already exists
-        for loco in self.locomotives:
-            if loco['id'] == loco_id:
-                return False
-                
+        if loco_id in self._id_set:
+            return False
+
         # Add if we have space
         if len(self.locomotives) < self.max_locos:
             self.locomotives.append({
                 'id': loco_id,
                 'name': loco_name
             })
+            self._id_set.add(loco_id)
             self._sort_alphabetically()
             return True
         return False
@@ -121,17 +150,26 @@ class LocoList:
     def clear(self):
         """Clear all locomotives"""
         self.locomotives = []
+        self._id_set.clear()
         self.selected_index = 0
     
     def save_to_file(self):
-        """Save locomotive list to file"""
+        """Save locomotive list to file (packed binary format)"""
         try:
-            data = {
-                'locomotives': self.locomotives,
-                'selected_index': self.selected_index
-            }
-            with open(self.filename, 'w') as f:
-                json.dump(data, f)
+            # Length-prefixed binary: magic, count, selected index, then
+            # per entry one length byte + utf-8 id and the same for the
+            # name. At most 5 tiny records, so this skips the whole JSON
+            # serializer for a handful of packs
+            parts = [_FILE_MAGIC, struct.pack('<BB', len(self.locomotives), self.selected_index)]
+            for loco in self.locomotives:
+                loco_id = loco['id'].encode()
+                loco_name = loco['name'].encode()
+                parts.append(struct.pack('<B', len(loco_id)))
+                parts.append(loco_id)
+                parts.append(struct.pack('<B', len(loco_name)))
+                parts.append(loco_name)
+            with open(self.filename, 'wb') as f:
+                f.write(b''.join(parts))
             print(f"Locomotive list saved to {self.filename}")
             return True
         except Exception as e:
@@ -141,12 +179,34 @@ class LocoList:
     def load_from_file(self):
         """Load locomotive list from file"""
         try:
-            with open(self.filename, 'r') as f:
-                data = json.load(f)
-            
-            self.locomotives = data.get('locomotives', [])
-            self.selected_index = data.get('selected_index', 0)
-            
+            with open(self.filename, 'rb') as f:
+                data = f.read()
+
+            if data[:3] == _FILE_MAGIC:
+                count = data[3]
+                selected = data[4]
+                locomotives = []
+                off = 5
+                for _ in range(count):
+                    n = data[off]
+                    off += 1
+                    loco_id = str(data[off:off + n], 'utf-8')
+                    off += n
+                    n = data[off]
+                    off += 1
+                    loco_name = str(data[off:off + n], 'utf-8')
+                    off += n
+                    locomotives.append({'id': loco_id, 'name': loco_name})
+                self.locomotives = locomotives
+                self.selected_index = selected
+            else:
+                # Legacy JSON file - parse once, next save migrates it
+                parsed = json.loads(data)
+                self.locomotives = parsed.get('locomotives', [])
+                self.selected_index = parsed.get('selected_index', 0)
+
+            self._id_set = {loco['id'] for loco in self.locomotives}
+
             # Validate selected_index
             if self.selected_index >= len(self.locomotives):
                 self.selected_index = 0
@@ -157,146 +217,130 @@ class LocoList:
             print(f"Could not load locomotive list: {e}")
             # Initialize with default locomotive if file doesn't exist
             self.locomotives = []
+            self._id_set = set()
             self.selected_index = 0
             return False
     
-    def update_from_rocrail_response(self, xml_response):
-        """Update locomotive list from RocRail query response
+    def begin_update(self):
+        """Start a streaming locomotive update.
+
+        The protocol layer feeds complete <lc> entries one at a time as
+        they arrive off the socket, so the full lclist response never
+        has to sit in RAM.
+        """
+        self._pending = []
+        self._pending_ids = set()
+
+    def feed_entry(self, lc_entry):
+        """Feed one complete <lc ...> entry during a streaming update
         
         Args:
-            xml_response: XML string response from RocRail
-            
+            lc_entry: Single locomotive XML entry (str or bytes)
+        """
+        if self._pending is None or len(self._pending) >= self.max_locos:
+            # Past the cap the entry is never decoded at all
+            return
+        if not isinstance(lc_entry, str):
+            lc_entry = str(lc_entry, 'utf-8')
+        loco_info = self._extract_loco_info_from_entry(lc_entry)
+        if loco_info and loco_info['id'] not in self._pending_ids:
+            # Duplicates must not consume cap slots - finish_update
+            # dedupes too, but by then a repeated id would already have
+            # displaced a distinct locomotive from the capped list
+            self._pending_ids.add(loco_info['id'])
+            self._pending.append(loco_info)
+
+    def finish_update(self):
+        """Finish a streaming update and apply the collected locomotives
+        
         Returns:
             True if locomotives were updated, False otherwise
         """
-        try:
-            # Debug: Print what we're trying to parse
-            print(f"[LOCO_PARSE] Attempting to parse {len(xml_response)} chars")
-            
-            # Check if we have a complete lclist structure
-            if '<lclist>' not in xml_response or '</lclist>' not in xml_response:
-                print("[LOCO_PARSE] Incomplete lclist structure - waiting for more data")
-                return False
-            
-            # Extract the complete lclist section
-            start_idx = xml_response.find('<lclist>')
-            end_idx = xml_response.find('</lclist>') + len('</lclist>')
-            
-            if start_idx == -1 or end_idx == -1:
-                print("[LOCO_PARSE] Could not find complete lclist boundaries")
-                return False
-            
-            lclist_section = xml_response[start_idx:end_idx]
-            print(f"[LOCO_PARSE] Extracted lclist section: {len(lclist_section)} chars")
-            
-            # Use the new intelligent locomotive extraction
-            extraction_result = self.extract_locomotives_from_lclist(lclist_section)
-            locomotives_found = extraction_result['locomotives']
-            
-            print(f"[LOCO_PARSE] Extraction result: {extraction_result['total_found']} locomotives from {extraction_result['entries_processed']} entries")
-            
-            if locomotives_found:
-                # Clear existing list and add new locomotives
-                old_count = len(self.locomotives)
-                self.clear()
-                
-                # Add locomotives (up to max limit)
-                added = 0
-                for loco_info in locomotives_found:
-                    if self.add_locomotive(loco_info['id'], loco_info['name']):
-                        added += 1
-                        print(f"[LOCO_PARSE] Added: {loco_info['name']} (ID: {loco_info['id']})")
-                        if added >= self.max_locos:
-                            print(f"[LOCO_PARSE] Reached maximum locomotives limit ({self.max_locos})")
-                            break
-                
-                # Save updated list if we added any
-                if added > 0:
-                    self.save_to_file()
-                    print(f"[LOCO_PARSE] ✅ Successfully updated locomotive list: {old_count} -> {added} locos")
-                    print(f"[LOCO_PARSE] Final list: {', '.join([loco['name'] for loco in self.locomotives])}")
-                    return True
-                else:
-                    print("[LOCO_PARSE] ❌ No locomotives were added to the list")
-                    return False
-            else:
-                print("[LOCO_PARSE] ❌ No valid locomotives found in lclist")
-                return False
-                
-        except Exception as e:
-            print(f"[LOCO_PARSE] ❌ Error parsing locomotives: {e}")
+        locomotives_found = self._pending
+        self._pending = None
+        self._pending_ids = None
+        if not locomotives_found:
+            if _DEBUG:
+                print("[LOCO_PARSE] No valid locomotives found in lclist")
             return False
-        finally:
-            gc.collect()
-    
-    def extract_locomotives_from_lclist(self, lclist_xml):
-        """Extract locomotives specifically from lclist XML (locomotive definitions, not status updates)
+
+        old_count = len(self.locomotives)
+        self.clear()
+
+        added = 0
+        for loco_info in locomotives_found:
+            if self.add_locomotive(loco_info['id'], loco_info['name']):
+                added += 1
+                if added >= self.max_locos:
+                    break
+
+        if added > 0:
+            self.save_to_file()
+            print(f"[LOCO_PARSE] Updated locomotive list: {old_count} -> {added} locos")
+            return True
+        if _DEBUG:
+            print("[LOCO_PARSE] No locomotives were added to the list")
+        return False
+
+    def update_from_rocrail_response(self, xml_response):
+        """Update locomotive list from RocRail query response
+        
+        Compatibility wrapper around the streaming update path: splits
+        the lclist into <lc> entries and feeds them through
+        begin_update/feed_entry/finish_update, so both entry points
+        share one parser instead of a second hand-rolled scanner.
         
         Args:
-            lclist_xml: XML string containing lclist structure
+            xml_response: XML string response from RocRail
             
         Returns:
-            Dict with locomotive information: {'locomotives': [list], 'total_found': int}
+            True if locomotives were updated, False otherwise
         """
         try:
-            locomotives_found = []
-            
-            print(f"[LOCO_EXTRACT] Processing lclist XML: {len(lclist_xml)} chars")
-            print(f"[LOCO_EXTRACT] Sample: {lclist_xml[:200]}...")
-            
-            # Look for locomotive definition entries (not status updates)
-            text = lclist_xml
-            start_pos = 0
-            loco_count = 0
-            
+            # One bounded scan instead of two 'in' probes plus two finds:
+            # locate the closing tag first (its position also bounds the
+            # opening-tag search), and bail out cheaply on partial data
+            end_idx = xml_response.find('</lclist>')
+            if end_idx == -1:
+                if _DEBUG:
+                    print("[LOCO_PARSE] Incomplete lclist structure - waiting for more data")
+                return False
+            start_idx = xml_response.find('<lclist>', 0, end_idx)
+            if start_idx == -1:
+                if _DEBUG:
+                    print("[LOCO_PARSE] Incomplete lclist structure - waiting for more data")
+                return False
+
+            text = xml_response[start_idx:end_idx]
+
+            self.begin_update()
+            pos = 0
             while True:
-                # Find <lc entry
-                lc_pos = text.find('<lc ', start_pos)
+                lc_pos = text.find('<lc ', pos)
                 if lc_pos == -1:
                     break
-                
-                # Find the end of this locomotive entry (either /> or </lc> or next <lc)
+
+                # Entry ends at /> or at the next <lc (malformed nesting)
                 entry_end = text.find('/>', lc_pos)
                 next_lc = text.find('<lc ', lc_pos + 4)
-                
-                # Determine the actual end of this entry
                 if entry_end != -1 and (next_lc == -1 or entry_end < next_lc):
-                    lc_entry = text[lc_pos:entry_end + 2]
+                    self.feed_entry(text[lc_pos:entry_end + 2])
                 elif next_lc != -1:
-                    lc_entry = text[lc_pos:next_lc]
-                else:
-                    # Take rest of text
-                    lc_entry = text[lc_pos:]
-                
-                loco_count += 1
-                print(f"[LOCO_EXTRACT] Processing locomotive entry {loco_count}: {lc_entry[:100]}...")
-                
-                # Extract locomotive information from this entry
-                loco_info = self._extract_loco_info_from_entry(lc_entry)
-                if loco_info:
-                    locomotives_found.append(loco_info)
-                    print(f"[LOCO_EXTRACT] ✓ Found locomotive: {loco_info}")
-                else:
-                    print(f"[LOCO_EXTRACT] ✗ Could not extract info from entry")
-                
-                # Move to next entry
-                if next_lc != -1:
-                    start_pos = next_lc
+                    self.feed_entry(text[lc_pos:next_lc])
                 else:
+                    self.feed_entry(text[lc_pos:])
+
+                if next_lc == -1:
                     break
-            
-            print(f"[LOCO_EXTRACT] Total entries processed: {loco_count}")
-            print(f"[LOCO_EXTRACT] Valid locomotives extracted: {len(locomotives_found)}")
-            
-            return {
-                'locomotives': locomotives_found,
-                'total_found': len(locomotives_found),
-                'entries_processed': loco_count
-            }
-                
+                pos = next_lc
+
+            return self.finish_update()
+
         except Exception as e:
-            print(f"[LOCO_EXTRACT] Error extracting locomotives: {e}")
-            return {'locomotives': [], 'total_found': 0, 'entries_processed': 0}
+            print(f"[LOCO_PARSE] ❌ Error parsing locomotives: {e}")
+            self._pending = None
+            self._pending_ids = None
+            return False
     
     def _extract_loco_info_from_entry(self, lc_entry):
         """Extract locomotive info from a single <lc> entry
@@ -312,28 +356,26 @@ class LocoList:
             # Locomotive definitions have attributes like: image, roadname, desc, dectype
             # Status updates have attributes like: V, dir, server, placing
             
-            has_definition_attrs = any(attr in lc_entry for attr in [
-                'image=', 'roadname=', 'desc=', 'dectype=', 'owner=', 'color=', 'number='
-            ])
-            
-            has_status_attrs = any(attr in lc_entry for attr in [
-                'V=', 'dir=', 'server=', 'placing=', 'runtime=', 'throttleid='
-            ])
+            attrs = self._parse_attrs(lc_entry)
+
+            has_definition_attrs = any(a in attrs for a in _DEF_ATTRS)
+            has_status_attrs = any(a in attrs for a in _STAT_ATTRS)
             
             # Skip status updates - we only want locomotive definitions
             if has_status_attrs and not has_definition_attrs:
-                print(f"[LOCO_EXTRACT] Skipping status update entry")
+                if _DEBUG:
+                    print("[LOCO_EXTRACT] Skipping status update entry")
                 return None
             
             # Extract ID (primary identifier)
-            loco_id = self._extract_attribute(lc_entry, 'id')
+            loco_id = attrs.get('id')
             
             # Extract shortid (secondary identifier)
-            loco_shortid = self._extract_attribute(lc_entry, 'shortid')
+            loco_shortid = attrs.get('shortid')
             
             # Extract additional info
-            loco_roadname = self._extract_attribute(lc_entry, 'roadname')
-            loco_number = self._extract_attribute(lc_entry, 'number')
+            loco_roadname = attrs.get('roadname')
+            loco_number = attrs.get('number')
             
             # Determine the best identifier
             identifier = None
@@ -353,45 +395,48 @@ class LocoList:
                 display_name = f"{identifier} #{loco_number.strip()}"
             
             if identifier:
+                # Only id and name survive - shortid/roadname/number were
+                # carried along in every record but never read again
                 return {
                     'id': identifier,
-                    'name': display_name or identifier,
-                    'shortid': loco_shortid or '',
-                    'roadname': loco_roadname or '',
-                    'number': loco_number or ''
+                    'name': display_name or identifier
                 }
             else:
-                print(f"[LOCO_EXTRACT] No valid identifier found in entry")
+                if _DEBUG:
+                    print("[LOCO_EXTRACT] No valid identifier found in entry")
                 return None
                 
         except Exception as e:
             print(f"[LOCO_EXTRACT] Error processing locomotive entry: {e}")
             return None
     
-    def _extract_attribute(self, xml_text, attr_name):
-        """Extract attribute value from XML text
+    def _parse_attrs(self, lc_entry):
+        """Parse all attributes of an <lc> entry into a dict in one pass
+        
+        One walk over the '="' markers replaces both the definition/
+        status classification probes and the repeated per-attribute
+        _extract_attribute scans (formerly ~7 independent find passes
+        per entry, each rebuilding its needle).
         
         Args:
-            xml_text: XML text containing the attribute
-            attr_name: Name of attribute to extract
+            lc_entry: Single locomotive XML entry
             
         Returns:
-            Attribute value or None if not found
+            Dict mapping attribute names to their string values
         """
-        try:
-            pattern = f'{attr_name}="'
-            start_pos = xml_text.find(pattern)
-            if start_pos == -1:
-                return None
-            
-            value_start = start_pos + len(pattern)
-            value_end = xml_text.find('"', value_start)
+        attrs = {}
+        pos = lc_entry.find('="')
+        while pos != -1:
+            # Walk back over the attribute name
+            start = pos
+            while start > 0 and lc_entry[start - 1] not in ' <':
+                start -= 1
+            value_end = lc_entry.find('"', pos + 2)
             if value_end == -1:
-                return None
-            
-            return xml_text[value_start:value_end]
-        except:
-            return None
+                break
+            attrs[lc_entry[start:pos]] = lc_entry[pos + 2:value_end]
+            pos = lc_entry.find('="', value_end + 1)
+        return attrs
     
     def get_status_string(self):
         """Get status string for debugging
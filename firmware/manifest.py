@@ -0,0 +1,22 @@
+# manifest.py - MicroPython frozen-module manifest
+#
+# Freezing the boot-path modules into the firmware image skips source
+# tokenisation and bytecode compilation on every power-on / deep-sleep wake,
+# cutting tens to hundreds of milliseconds off cold start on ESP32.
+#
+# Build with:
+#   make BOARD=ESP32_GENERIC FROZEN_MANIFEST=/path/to/firmware/manifest.py
+#
+# A boot.py left on the filesystem still overrides the frozen copy
+# (filesystem is searched first), so field overrides remain possible.
+
+include("$(PORT_DIR)/boards/manifest.py")
+
+# Boot-path modules: parsed on every single boot, freeze them all.
+module("boot.py")
+module("hardware_config.py")
+module("config.py")
+
+# Main application + controllers (imported on the default boot branch).
+module("rocrail_controller_asyncio.py")
+package("lib")
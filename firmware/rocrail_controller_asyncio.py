@@ -18,17 +18,27 @@ from lib.async_controllers.async_state import AsyncControllerState
 from lib.async_controllers.async_leds import AsyncNeoPixelController
 from lib.loco_list import LocoList
 
+# Pre-bound millisecond sleep: MicroPython's asyncio.sleep_ms skips the
+# float conversion inside sleep() and the alias avoids a per-iteration
+# attribute lookup in the task loops
+if hasattr(asyncio, 'sleep_ms'):
+    _sleep_ms = asyncio.sleep_ms
+else:
+    async def _sleep_ms(ms):
+        await asyncio.sleep(ms / 1000)
+
 class LocomotiveControllerAsync:
     """Main asyncio-based locomotive controller"""
     
-    def __init__(self):
+    def __init__(self, btn_red=None, btn_green=None, neo=None):
         # Initialize core components
         self.loco_list = LocoList(LOCO_LIST_FILE)
         self.state = AsyncControllerState()
-        
-        # Initialize hardware managers
-        self.hardware = AsyncHardwareManager()
-        self.leds = AsyncNeoPixelController()
+
+        # Initialize hardware managers (button handles from boot.py are
+        # reused to avoid reconfiguring the same pads twice)
+        self.hardware = AsyncHardwareManager(btn_red=btn_red, btn_green=btn_green)
+        self.leds = AsyncNeoPixelController(neo=neo)
         self.wifi = AsyncWiFiManager(self.state)
         self.protocol = AsyncRocrailProtocol(self.loco_list, self.state)
         
@@ -100,6 +110,7 @@ class LocomotiveControllerAsync:
         
         # Core system tasks (LED task already running)
         self.tasks.extend([
+            asyncio.create_task(self.state.drain_log()),
             asyncio.create_task(self._hardware_input_task()),
             asyncio.create_task(self._speed_control_task()),
             asyncio.create_task(self._wifi_monitor_task()),
@@ -165,7 +176,7 @@ class LocomotiveControllerAsync:
                 print(f"Hardware input error: {e}")
                 await asyncio.sleep(0.1)
                 
-            await asyncio.sleep(BUTTON_CHECK_INTERVAL / 1000.0)
+            await _sleep_ms(BUTTON_CHECK_INTERVAL)
             
     async def _speed_control_task(self):
         """Handle speed control and sending"""
@@ -177,8 +188,10 @@ class LocomotiveControllerAsync:
                 # Wait for system to be ready
                 await self.system_ready.wait()
                 
-                # Check if speed sending is enabled
-                if await self.state.is_speed_enabled():
+                # Check if speed sending is enabled - sync read, this
+                # runs every speed tick and a coroutine call per tick
+                # only buys scheduler bookkeeping
+                if self.state.speed_enabled():
                     if self.current_speed != last_speed:
                         await self.protocol.send_speed_direction(self.current_speed, self.current_direction)
                         last_speed = self.current_speed
@@ -193,7 +206,7 @@ class LocomotiveControllerAsync:
                 print(f"Speed control error: {e}")
                 await asyncio.sleep(0.1)
                 
-            await asyncio.sleep(SPEED_UPDATE_INTERVAL / 1000.0)
+            await _sleep_ms(SPEED_UPDATE_INTERVAL)
             
     async def _led_update_task(self):
         """Handle LED status updates - starts immediately for connection feedback"""
@@ -222,7 +235,7 @@ class LocomotiveControllerAsync:
                 print(f"LED update error: {e}")
                 await asyncio.sleep(0.1)
                 
-            await asyncio.sleep(NEOPIXEL_BLINK_INTERVAL / 1000.0)
+            await _sleep_ms(NEOPIXEL_BLINK_INTERVAL)
             
     async def _wifi_monitor_task(self):
         """Monitor WiFi connection"""
@@ -248,7 +261,7 @@ class LocomotiveControllerAsync:
                 print(f"WiFi monitor error: {e}")
                 await asyncio.sleep(1)
                 
-            await asyncio.sleep(WIFI_CHECK_INTERVAL / 1000.0)
+            await _sleep_ms(WIFI_CHECK_INTERVAL)
             
     async def _protocol_monitor_task(self):
         """Monitor RocRail protocol connection"""
@@ -257,7 +270,7 @@ class LocomotiveControllerAsync:
         while True:
             try:
                 # Check connection status less frequently as auto-reconnect handles recovery
-                if not await self.protocol.is_connected():
+                if not self.protocol.is_connected():
                     rocrail_status = await self.state.get_rocrail_status()
                     
                     # Only intervene if not already reconnecting
@@ -282,7 +295,14 @@ class LocomotiveControllerAsync:
     async def _memory_monitor_task(self):
         """Monitor memory usage"""
         print("Memory monitor task started")
-        
+
+        # Raise the allocator's collection threshold once so incremental
+        # GC kicks in before exhaustion instead of hot paths forcing
+        # full synchronous sweeps
+        import gc
+        if hasattr(gc, "threshold") and hasattr(gc, "mem_free"):
+            gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
+
         while True:
             try:
                 import gc
@@ -379,22 +399,29 @@ class LocomotiveControllerAsync:
         print("Cleanup complete")
 
 # Main entry point
-async def main():
+async def main(btn_red=None, btn_green=None, neo=None):
     """Main async entry point"""
-    controller = LocomotiveControllerAsync()
+    controller = LocomotiveControllerAsync(btn_red=btn_red, btn_green=btn_green, neo=neo)
     await controller.run()
 
 # Run the async controller - MicroPython compatible
-def run_controller():
-    """Run the controller with MicroPython compatible asyncio"""
+def run_controller(btn_red=None, btn_green=None, neo=None):
+    """Run the controller with MicroPython compatible asyncio
+
+    btn_red/btn_green: already-configured Pin handles from boot.py,
+    reused so the pad mux is not set up a second time. neo is the boot
+    NeoPixel instance - reusing it avoids a second RMT channel setup,
+    another pixel buffer allocation and the LED glitch the RMT
+    reconfiguration causes during handover.
+    """
     try:
         # Try asyncio.run() first (newer MicroPython)
         if hasattr(asyncio, 'run'):
-            asyncio.run(main())
+            asyncio.run(main(btn_red, btn_green, neo))
         else:
             # Fall back to event loop method (older MicroPython)
             loop = asyncio.get_event_loop()
-            loop.run_until_complete(main())
+            loop.run_until_complete(main(btn_red, btn_green, neo))
     except Exception as e:
         print(f"Error running controller: {e}")
 